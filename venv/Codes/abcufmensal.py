@@ -0,0 +1,98 @@
+import pandas as pd
+
+import cache_fatos
+from agregacoes import grupo_ou_cliente
+from consultas import Consulta, Filtros, filtrar_offline, ler_consulta
+from curva_abc import agregar_e_classificar, classificar
+from registro import Relatorio, registrar
+
+# ABC de grupos/clientes para cada combinação mês × UF dos últimos 24 meses
+QUERY_VENDAS = """
+    SELECT
+        DATE_TRUNC('month', bf.datafaturamento)::date AS mes,
+        bc.uf,
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN bc.nomecliente 
+            ELSE bc.grupoeconomico 
+        END AS grupo_ou_cliente,
+        SUM(bf.precounitario * bf.quantidadenegociada) AS faturamento
+    FROM
+        dbo.bi_fato AS bf
+    INNER JOIN
+        dbo.bi_cliente AS bc ON bf.codigocliente = bc.codigocliente
+    WHERE
+        bf.tipomovumento IN ('V', 'B'){filtros}
+    GROUP BY
+        1, 2, 3;
+"""
+
+
+def filtros_padrao():
+    # Mês corrente e os 23 anteriores
+    inicio = pd.Timestamp.today().to_period('M').start_time - pd.DateOffset(months=23)
+    return Filtros(inicio=inicio)
+
+
+def gerar(connect, filtros):
+    consulta = Consulta(QUERY_VENDAS).aplicar(
+        filtros,
+        coluna_data="bf.datafaturamento",
+        coluna_uf="bc.uf",
+        coluna_produto="bf.codigoproduto",
+    )
+    df = ler_consulta(connect, consulta)
+    df['mes'] = pd.to_datetime(df['mes'])
+    return classificar(df, por=['mes', 'uf'])
+
+
+def gerar_offline(filtros):
+    fatos = cache_fatos.ler_fatos(
+        "bi_fato",
+        inicio=filtros.inicio,
+        fim=filtros.fim,
+        colunas=["codigocliente", "codigoproduto", "datafaturamento", "precounitario", "quantidadenegociada"],
+    )
+    fatos = filtrar_offline(fatos, filtros)
+    df = fatos.merge(cache_fatos.ler_dimensao("bi_cliente"), on="codigocliente", how="inner")
+    df = pd.DataFrame({
+        'mes': df['datafaturamento'].dt.to_period('M').dt.start_time,
+        'uf': df['uf'],
+        'grupo_ou_cliente': grupo_ou_cliente(df),
+        'faturamento': df['precounitario'] * df['quantidadenegociada'],
+    })
+    return agregar_e_classificar(df, 'grupo_ou_cliente', por=['mes', 'uf'])
+
+
+def resumir(df, filtros):
+    print("📊 Curva ABC por mês e UF carregada!")
+    print(f"Filtros: {filtros.descricao()}")
+    print(f"Meses: {df['mes'].nunique()} | UFs: {df['uf'].nunique()} | Linhas: {len(df)}")
+
+    # Quantidade de grupos/clientes em cada classe, por mês × UF
+    print(f"\n🎯 Distribuição ABC (últimos meses):")
+    distribuicao = df.pivot_table(
+        index=['mes', 'uf'],
+        columns='Classificacao',
+        values='grupo_ou_cliente',
+        aggfunc='count',
+        fill_value=0,
+    )
+    print(distribuicao.tail(10))
+
+
+registrar(Relatorio(
+    nome="abcufmensal",
+    gerar=gerar,
+    gerar_offline=gerar_offline,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="ABC_UF_Mensal_",
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["abcufmensal", *sys.argv[1:]])
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Equivalentes em pandas das agregações SQL dos relatórios, usados no modo
+# offline sobre o cache local (cache_fatos.py). Os nomes de coluna seguem os
+# aliases devolvidos pelo PostgreSQL (sempre em minúsculas).
+
+
+def _faturamento(fatos):
+    return fatos["precounitario"] * fatos["quantidadenegociada"]
+
+
+def sem_grupo(clientes):
+    return clientes["grupoeconomico"].isna() | (clientes["grupoeconomico"] == "")
+
+
+def grupo_ou_cliente(clientes):
+    # CASE WHEN grupoeconomico IS NULL OR grupoeconomico = '' THEN nomecliente ELSE grupoeconomico END
+    return clientes["grupoeconomico"].where(~sem_grupo(clientes), clientes["nomecliente"])
+
+
+def agregar_clientes(fatos, clientes):
+    df = fatos.merge(clientes, on="codigocliente", how="inner")
+    df = df.assign(
+        grupo_ou_cliente=grupo_ou_cliente(df),
+        tipo_agrupamento=np.where(sem_grupo(df), "Cliente Individual", "Grupo Econômico"),
+        valor=_faturamento(df),
+    )
+
+    agregado = df.groupby(["grupo_ou_cliente", "tipo_agrupamento"], as_index=False).agg(
+        qtd_clientes=("codigocliente", "nunique"),
+        faturamento=("valor", "sum"),
+        qtd_pedidos=("datafaturamento", "count"),
+        qtd_itens_total=("quantidadenegociada", "sum"),
+        ultima_venda=("datafaturamento", "max"),
+    )
+    agregado["itens_por_pedidos"] = np.ceil(
+        agregado["qtd_itens_total"] / agregado["qtd_pedidos"].replace(0, np.nan)
+    )
+    colunas = [
+        "grupo_ou_cliente", "qtd_clientes", "faturamento", "qtd_pedidos",
+        "qtd_itens_total", "itens_por_pedidos", "ultima_venda", "tipo_agrupamento",
+    ]
+    return agregado[colunas].sort_values("faturamento", ascending=False, ignore_index=True)
+
+
+def _marcador(serie):
+    return np.where(serie.eq(True), "[✓]", "[ ]")
+
+
+def agregar_produtos(fatos, produtos, produtobase, ultimo_estoque):
+    df = fatos.merge(produtos, on="codigoproduto", how="inner")
+    df = df.merge(produtobase, left_on="codigoproduto", right_on="codigoprincipal", how="inner")
+    df["valor"] = _faturamento(df)
+
+    chaves = ["codigoproduto", "nomeproduto", "marca", "permitecompra", "permitevenda", "inativo"]
+    agregado = df.groupby(chaves, as_index=False, dropna=False).agg(
+        faturamento=("valor", "sum"),
+        qtd_itens=("quantidadenegociada", "sum"),
+        qtd_pedidos=("datafaturamento", "count"),
+        ultima_venda=("datafaturamento", "max"),
+    )
+    agregado["itens_por_pedidos"] = np.ceil(agregado["qtd_itens"] / agregado["qtd_pedidos"])
+    agregado = agregado.merge(
+        ultimo_estoque,
+        left_on="codigoproduto",
+        right_on="codigoprincipal",
+        how="left",
+    )
+    agregado["p_compra"] = _marcador(agregado["permitecompra"])
+    agregado["p_venda"] = _marcador(agregado["permitevenda"])
+    agregado["inativo"] = _marcador(agregado["inativo"])
+
+    colunas = [
+        "codigoproduto", "nomeproduto", "marca", "faturamento", "qtd_itens", "qtd_pedidos",
+        "itens_por_pedidos", "ultima_venda", "estoque_na_data", "data_estoque",
+        "p_compra", "p_venda", "inativo",
+    ]
+    return agregado[colunas].sort_values("faturamento", ascending=False, ignore_index=True)
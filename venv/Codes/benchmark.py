@@ -0,0 +1,146 @@
+import argparse
+import contextlib
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+
+import cache_fatos
+import dados_sinteticos
+from conexao import parametros_conexao
+from executar_relatorios import carregar_relatorios, executar
+from exportacao import FORMATOS
+
+# Roda os relatórios sobre a base sintética (dados_sinteticos.py) em várias
+# escalas e grava os tempos por etapa em <pasta>/resultados.jsonl, no mesmo
+# formato do registro do executar_relatorios. Comparar dois resultados.jsonl
+# mostra regressões e o efeito de cada otimização sem tocar em produção.
+#
+# As variáveis DB_* devem apontar para um Postgres de testes: cada escala
+# recria o schema dbo (ver a proteção em dados_sinteticos.carregada).
+ESCALAS = (100_000, 1_000_000, 10_000_000)
+
+
+def _preparar_base(escala, semente, forcar, sincronizar_cache):
+    connect = psycopg2.connect(**parametros_conexao())
+    try:
+        dados_sinteticos.carregar(connect, escala, semente, forcar)
+        if sincronizar_cache:
+            cache_fatos.sincronizar(connect)
+    finally:
+        connect.close()
+
+
+def rodar(escalas, nomes, pasta, semente=42, formato="xlsx", memoria=True, explain=False,
+          offline=False, repeticoes=1, forcar=False):
+    pasta = Path(pasta).resolve()
+    pasta.mkdir(parents=True, exist_ok=True)
+    registro = pasta / "resultados.jsonl"
+    relatorios = carregar_relatorios()
+
+    for escala in escalas:
+        saida = pasta / str(escala)
+        saida.mkdir(exist_ok=True)
+        # Cache de fatos e dimensão de marcas separados por escala, para não misturar bases
+        cache_fatos.PASTA_CACHE = saida / "cache"
+        _preparar_base(escala, semente, forcar, sincronizar_cache=offline)
+
+        modos = [(False, nomes)]
+        if offline:
+            modos.append((True, [nome for nome in nomes if relatorios[nome].gerar_offline]))
+        # Arquivos exportados ficam na pasta da escala
+        with contextlib.chdir(saida):
+            for modo_offline, nomes_modo in modos:
+                for repeticao in range(1, repeticoes + 1):
+                    print(f"\n##### {escala:,} fatos | {'offline' if modo_offline else 'online'} "
+                          f"| repetição {repeticao} #####")
+                    # Um worker: tempos e picos de memória sem interferência entre relatórios
+                    executar(
+                        nomes_modo,
+                        workers=1,
+                        offline=modo_offline,
+                        formato=formato,
+                        memoria=memoria,
+                        explain=explain,
+                        registro=str(registro),
+                        contexto={
+                            "benchmark": pasta.name,
+                            "escala": escala,
+                            "semente": semente,
+                            "repeticao": repeticao,
+                        },
+                    )
+    return registro
+
+
+def resumir(registro, benchmark=None):
+    """Mediana do tempo de cada relatório por escala, separando as etapas."""
+    df = pd.read_json(registro, lines=True, dtype=False)
+    if benchmark:
+        df = df[df["benchmark"] == benchmark]
+    df = df[df["erro"].isna()]
+    if df.empty:
+        print("Nenhuma execução sem erro para resumir")
+        return None
+
+    etapas = pd.json_normalize(df["etapas_s"].tolist()).fillna(0).set_index(df.index)
+    df = pd.concat([df[["relatorio", "modo", "escala"]], etapas], axis=1)
+    # O EXPLAIN ANALYZE repete a consulta; não faz parte do tempo do relatório
+    df["total"] = etapas.drop(columns="explain", errors="ignore").sum(axis=1)
+    tabela = df.groupby(["relatorio", "modo", "escala"]).median()
+
+    print("\n📊 Tempo total em segundos (gerar + exportação, mediana das repetições):")
+    print(tabela["total"].unstack("escala").round(2))
+    print("\n⏱️ Etapas por escala (segundos):")
+    print(tabela.round(3))
+    return tabela
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos relatórios sobre uma base sintética")
+    parser.add_argument(
+        "escalas",
+        nargs="*",
+        type=int,
+        default=list(ESCALAS),
+        help="Quantidades de linhas de fato (padrão: 100000 1000000 10000000)",
+    )
+    parser.add_argument("-r", "--relatorios", nargs="+", help="Relatórios a medir (padrão: todos)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("-f", "--formato", choices=FORMATOS, default="xlsx")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--pasta", help="Pasta de saída (padrão: benchmark_<data>)")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede picos de memória (mais rápido)")
+    parser.add_argument("--explain", action="store_true", help="Guarda o EXPLAIN (ANALYZE, BUFFERS) das consultas")
+    parser.add_argument("--offline", action="store_true", help="Também mede os relatórios a partir do cache local")
+    parser.add_argument("--forcar", action="store_true", help="Recarrega a base mesmo que já esteja igual")
+    args = parser.parse_args(argv)
+
+    nomes = args.relatorios or list(carregar_relatorios())
+    pasta = args.pasta or f"benchmark_{datetime.now():%Y-%m-%d_%H-%M}"
+    try:
+        registro = rodar(
+            args.escalas,
+            nomes,
+            pasta,
+            semente=args.semente,
+            formato=args.formato,
+            memoria=not args.sem_memoria,
+            explain=args.explain,
+            offline=args.offline,
+            repeticoes=args.repeticoes,
+            forcar=args.forcar,
+        )
+    except psycopg2.Error as e:
+        print("Erro ao conectar:", e)
+        return
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    resumir(registro, Path(pasta).resolve().name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+
+from conexao import parametros_conexao
+from instrumentacao import etapa
+
+# Cache local das tabelas de fato, particionado por mês em arquivos Parquet:
+#   cache/<tabela>/AAAA-MM.parquet  +  cache/<tabela>/_estado.json (watermark)
+# Meses anteriores ao mês da watermark são considerados fechados e nunca são
+# baixados de novo; o mês da watermark e os seguintes são sempre rebaixados.
+PASTA_CACHE = Path(os.getenv("CACHE_DIR", Path(__file__).parent / "cache"))
+
+TABELAS_FATO = ("bi_fato", "bi_fato_antigo")
+
+# Só bi_fato ainda recebe vendas; bi_fato_antigo terminou na data de corte
+TABELA_ABERTA = "bi_fato"
+
+# Vendas anteriores a esta data estão em dbo.bi_fato_antigo; a partir dela, em dbo.bi_fato
+DATA_CORTE_FATO = pd.Timestamp(os.getenv("FATO_DATA_CORTE", "2024-10-10"))
+
+# Tipos fixos das colunas de fato: um mês sem vendas sai do read_sql com
+# colunas object, e um concat com ele transformaria os números em object
+TIPOS_FATO = {
+    "codigocliente": "Int64",
+    "codigoproduto": "Int64",
+    "codigovendedor": "Int64",
+    "tipomovumento": "str",
+    "datafaturamento": "datetime64[ns]",
+    "precounitario": "float64",
+    "quantidadenegociada": "float64",
+}
+COLUNAS_FATO = tuple(TIPOS_FATO)
+
+# Dimensões pequenas, baixadas inteiras a cada sincronização
+QUERIES_DIMENSOES = {
+    "bi_cliente": """
+        SELECT codigocliente, nomecliente, grupoeconomico, uf
+        FROM dbo.bi_cliente
+    """,
+    "bi_produto": """
+        SELECT codigoproduto, nomeproduto, marca
+        FROM dbo.bi_produto
+    """,
+    "produtobase": """
+        SELECT codigoprincipal, permitecompra, permitevenda, inativo
+        FROM dbo.produtobase
+    """,
+    "bi_vendedor": """
+        SELECT codigovendedor, nomerepresentante
+        FROM dbo.bi_vendedor
+    """,
+}
+
+# Último estoque de cada produto, baixado de uma vez (DISTINCT ON) em vez de uma
+# subconsulta por produto. Na sincronização incremental só lê as datas >= watermark.
+# Linhas sem data ficam de fora aqui e vão para QUERY_ESTOQUE_SEM_DATA.
+QUERY_ULTIMO_ESTOQUE = """
+    SELECT DISTINCT ON (be.codigoprincipal)
+        be.codigoprincipal,
+        be.estoquenadata AS estoque_na_data,
+        be.data AS data_estoque
+    FROM dbo.bi_estoque be
+    WHERE be.data IS NOT NULL
+      AND (%(desde)s::timestamp IS NULL OR be.data >= %(desde)s)
+    ORDER BY be.codigoprincipal, be.data DESC
+"""
+
+# No banco, ORDER BY data DESC põe os NULLs primeiro: um lançamento sem data
+# vence o mais recente (como no antigo LIMIT 1). Como não dá para fazer isso
+# de forma incremental, essas linhas (poucas) são rebaixadas inteiras.
+QUERY_ESTOQUE_SEM_DATA = """
+    SELECT DISTINCT ON (be.codigoprincipal)
+        be.codigoprincipal,
+        be.estoquenadata AS estoque_na_data
+    FROM dbo.bi_estoque be
+    WHERE be.data IS NULL
+    ORDER BY be.codigoprincipal
+"""
+
+
+class CacheIndisponivel(Exception):
+    pass
+
+
+def _pasta_tabela(tabela):
+    if tabela not in TABELAS_FATO:
+        raise ValueError(f"Tabela de fato desconhecida: {tabela}")
+    return PASTA_CACHE / tabela
+
+
+def _arquivo_mes(tabela, mes):
+    return _pasta_tabela(tabela) / f"{mes:%Y-%m}.parquet"
+
+
+def ler_estado(tabela):
+    caminho = _pasta_tabela(tabela) / "_estado.json"
+    if not caminho.exists():
+        return {}
+    return json.loads(caminho.read_text(encoding="utf-8"))
+
+
+def _gravar_estado(tabela, estado):
+    caminho = _pasta_tabela(tabela) / "_estado.json"
+    caminho.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+
+
+def _tipar(df):
+    return df.astype({coluna: tipo for coluna, tipo in TIPOS_FATO.items() if coluna in df.columns})
+
+
+def _query_mes(tabela):
+    return f"""
+        SELECT {', '.join(COLUNAS_FATO)}
+        FROM dbo.{tabela}
+        WHERE tipomovumento IN ('V', 'B')
+          AND datafaturamento >= %(inicio)s
+          AND datafaturamento < %(fim)s
+    """
+
+
+def sincronizar_tabela(connect, tabela):
+    estado = ler_estado(tabela)
+    watermark = estado.get("watermark")
+    # O mês da watermark pode estar incompleto: recomeça do primeiro dia dele
+    desde = pd.Timestamp(watermark).to_period("M").start_time if watermark else None
+
+    with connect.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT MIN(datafaturamento), MAX(datafaturamento)
+            FROM dbo.{tabela}
+            WHERE tipomovumento IN ('V', 'B')
+              AND (%(desde)s::timestamp IS NULL OR datafaturamento >= %(desde)s)
+            """,
+            {"desde": desde},
+        )
+        minimo, maximo = cursor.fetchone()
+
+    if minimo is None:
+        print(f"ℹ️ {tabela}: nenhuma linha nova desde {watermark}")
+        return 0
+
+    _pasta_tabela(tabela).mkdir(parents=True, exist_ok=True)
+    ultimo = pd.Timestamp(maximo).to_period("M")
+    if tabela == TABELA_ABERTA:
+        # Inclui o mês corrente (aberto), mesmo que o servidor ainda não tenha vendas nele
+        ultimo = max(ultimo, pd.Timestamp.today().to_period("M"))
+    meses = pd.period_range(pd.Timestamp(minimo).to_period("M"), ultimo, freq="M")
+
+    total = 0
+    for mes in meses:
+        df_mes = pd.read_sql(
+            _query_mes(tabela),
+            connect,
+            params={"inicio": mes.start_time, "fim": (mes + 1).start_time},
+        )
+        df_mes = _tipar(df_mes)
+        df_mes.to_parquet(_arquivo_mes(tabela, mes.start_time), index=False)
+        total += len(df_mes)
+        print(f"   {tabela} {mes}: {len(df_mes):,} linhas")
+
+    _gravar_estado(tabela, {
+        "watermark": pd.Timestamp(maximo).isoformat(),
+        "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+    })
+    return total
+
+
+def sincronizar_dimensoes(connect):
+    pasta = PASTA_CACHE / "dimensoes"
+    pasta.mkdir(parents=True, exist_ok=True)
+    for nome, query in QUERIES_DIMENSOES.items():
+        df = pd.read_sql(query, connect)
+        df.to_parquet(pasta / f"{nome}.parquet", index=False)
+        print(f"   dimensão {nome}: {len(df):,} linhas")
+
+
+def sincronizar_estoque(connect):
+    caminho = PASTA_CACHE / "dimensoes" / "ultimo_estoque.parquet"
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    atual = pd.read_parquet(caminho) if caminho.exists() else None
+    # Relê o dia da watermark para pegar lançamentos feitos depois da última sincronização
+    desde = atual["data_estoque"].max() if atual is not None and len(atual) else None
+
+    novo = pd.read_sql(QUERY_ULTIMO_ESTOQUE, connect, params={"desde": desde})
+    novo["data_estoque"] = pd.to_datetime(novo["data_estoque"])
+    if atual is not None:
+        # Para cada produto fica o registro mais recente; em empate vence o recém-baixado
+        novo = (
+            pd.concat([atual, novo], ignore_index=True)
+            .sort_values("data_estoque", kind="stable")
+            .drop_duplicates("codigoprincipal", keep="last")
+        )
+    novo.to_parquet(caminho, index=False)
+    print(f"   último estoque: {len(novo):,} produtos")
+
+    sem_data = pd.read_sql(QUERY_ESTOQUE_SEM_DATA, connect)
+    sem_data.to_parquet(caminho.with_name("estoque_sem_data.parquet"), index=False)
+    print(f"   estoque sem data: {len(sem_data):,} produtos")
+
+
+def sincronizar(connect, tabelas=TABELAS_FATO):
+    for tabela in tabelas:
+        print(f"🔄 Sincronizando {tabela}...")
+        total = sincronizar_tabela(connect, tabela)
+        print(f"✅ {tabela}: {total:,} linhas atualizadas")
+    print("🔄 Sincronizando dimensões...")
+    sincronizar_dimensoes(connect)
+    sincronizar_estoque(connect)
+
+
+def ler_fatos(tabela, inicio=None, fim=None, colunas=None):
+    """Lê do cache as linhas com inicio <= datafaturamento < fim."""
+    pasta = _pasta_tabela(tabela)
+    if not ler_estado(tabela):
+        raise CacheIndisponivel(f"Cache de {tabela} vazio: rode cache_fatos.py antes")
+
+    inicio = pd.Timestamp(inicio) if inicio is not None else None
+    fim = pd.Timestamp(fim) if fim is not None else None
+    partes = []
+    for arquivo in sorted(pasta.glob("*.parquet")):
+        mes = pd.Period(arquivo.stem, freq="M")
+        # Descarta partições inteiras fora do período sem abrir o arquivo
+        if inicio is not None and mes.end_time < inicio:
+            continue
+        if fim is not None and mes.start_time >= fim:
+            continue
+        with etapa("cache"):
+            # Arquivos gravados antes de TIPOS_FATO podem ter meses vazios sem tipo
+            partes.append(_tipar(pd.read_parquet(arquivo, columns=colunas)))
+
+    if not partes:
+        return _tipar(pd.DataFrame(columns=colunas or list(COLUNAS_FATO)))
+    df = pd.concat(partes, ignore_index=True)
+    if inicio is not None:
+        df = df[df["datafaturamento"] >= inicio]
+    if fim is not None:
+        df = df[df["datafaturamento"] < fim]
+    return df
+
+
+def ler_dimensao(nome):
+    caminho = PASTA_CACHE / "dimensoes" / f"{nome}.parquet"
+    if not caminho.exists():
+        raise CacheIndisponivel(f"Dimensão {nome} ausente no cache: rode cache_fatos.py antes")
+    with etapa("cache"):
+        return pd.read_parquet(caminho)
+
+
+def ler_ultimo_estoque():
+    """Mesmo resultado do DISTINCT ON ... ORDER BY data DESC do banco.
+
+    Produtos com lançamento sem data usam o estoque dele; data_estoque continua
+    sendo a maior data preenchida (o MAX(data) OVER da consulta online).
+    """
+    datado = ler_dimensao("ultimo_estoque")
+    sem_data = ler_dimensao("estoque_sem_data")
+    df = datado.merge(sem_data, on="codigoprincipal", how="outer", suffixes=("", "_sem_data"))
+    df["estoque_na_data"] = df["estoque_na_data_sem_data"].where(
+        df["codigoprincipal"].isin(sem_data["codigoprincipal"]), df["estoque_na_data"]
+    )
+    return df[["codigoprincipal", "estoque_na_data", "data_estoque"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincroniza o cache local de fatos")
+    parser.add_argument(
+        "tabelas",
+        nargs="*",
+        help=f"Tabelas de fato a sincronizar: {', '.join(TABELAS_FATO)} (padrão: todas)",
+    )
+    args = parser.parse_args(argv)
+    # choices com nargs="*" rejeita a lista vazia em algumas versões do argparse
+    desconhecidas = [tabela for tabela in args.tabelas if tabela not in TABELAS_FATO]
+    if desconhecidas:
+        parser.error(f"Tabelas de fato desconhecidas: {', '.join(desconhecidas)}")
+
+    connect = None
+    try:
+        connect = psycopg2.connect(**parametros_conexao())
+        print("Conexão estabelecida com sucesso!")
+        sincronizar(connect, args.tabelas or TABELAS_FATO)
+
+    except psycopg2.Error as e:
+        print("Erro ao conectar:", e)
+
+    finally:
+        if connect:
+            connect.close()
+            print("Conexão fechada")
+
+
+if __name__ == "__main__":
+    main()
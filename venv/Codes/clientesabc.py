@@ -0,0 +1,113 @@
+import cache_fatos
+from agregacoes import agregar_clientes
+from consultas import Consulta, Filtros, filtrar_offline, ler_consulta, ultimos_meses
+from curva_abc import classificar
+from registro import Relatorio, registrar
+
+QUERY_VENDAS = """
+    SELECT
+        -- 👇 LÓGICA: Se grupo vazio, usa nome do cliente
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN bc.nomecliente 
+            ELSE bc.grupoeconomico 
+        END AS grupo_ou_cliente,
+        
+        COUNT(DISTINCT bc.codigocliente) AS qtd_clientes,
+        SUM(bf.precounitario * bf.quantidadenegociada) AS faturamento,
+        COUNT(bf.datafaturamento) AS Qtd_Pedidos,
+        SUM(bf.quantidadenegociada) AS Qtd_Itens_Total,
+        CEILING(SUM(bf.quantidadenegociada) / NULLIF(COUNT(bf.datafaturamento), 0)) AS Itens_por_Pedidos,
+        MAX(bf.datafaturamento) AS ultima_venda,
+        
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN 'Cliente Individual' 
+            ELSE 'Grupo Econômico' 
+        END AS tipo_agrupamento
+
+    FROM
+        dbo.bi_fato AS bf
+    INNER JOIN
+        dbo.bi_cliente AS bc ON bf.codigocliente = bc.codigocliente
+    WHERE
+        bf.tipomovumento IN ('V', 'B')
+        AND bc.grupoeconomico <> 'BMB MATERIAL'{filtros}
+    GROUP BY
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN bc.nomecliente 
+            ELSE bc.grupoeconomico 
+        END,
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN 'Cliente Individual' 
+            ELSE 'Grupo Econômico' 
+        END
+    ORDER BY
+        faturamento DESC;
+"""
+
+
+def filtros_padrao():
+    # Últimos 3 meses, clientes do RJ
+    inicio, fim = ultimos_meses(3)
+    return Filtros(inicio=inicio, fim=fim, ufs=("RJ",))
+
+
+def gerar(connect, filtros):
+    consulta = Consulta(QUERY_VENDAS).aplicar(
+        filtros,
+        coluna_data="bf.datafaturamento",
+        coluna_uf="bc.uf",
+        coluna_produto="bf.codigoproduto",
+    )
+    # Executar a query
+    df_consolidado = ler_consulta(connect, consulta)
+    return classificar(df_consolidado)
+
+
+def gerar_offline(filtros):
+    fatos = cache_fatos.ler_fatos("bi_fato", inicio=filtros.inicio, fim=filtros.fim)
+    fatos = filtrar_offline(fatos, filtros)
+    clientes = cache_fatos.ler_dimensao("bi_cliente")
+    # grupoeconomico <> 'BMB MATERIAL' no SQL também descarta grupos nulos
+    clientes = clientes[
+        clientes['grupoeconomico'].notna()
+        & (clientes['grupoeconomico'] != 'BMB MATERIAL')
+    ]
+    return classificar(agregar_clientes(fatos, clientes))
+
+
+def resumir(df_consolidado, filtros):
+    # Verificar os dados
+    print("📊 Dados consolidados carregados!")
+    print(f"Total de grupos/clientes: {len(df_consolidado)}")
+    print(f"Grupos econômicos: {len(df_consolidado[df_consolidado['tipo_agrupamento'] == 'Grupo Econômico'])}")
+    print(f"Clientes individuais: {len(df_consolidado[df_consolidado['tipo_agrupamento'] == 'Cliente Individual'])}")
+    print(f"Faturamento total ({filtros.descricao()}): R$ {df_consolidado['faturamento'].sum():,.2f}")
+    
+    print("\n📋 Top Grupos/Clientes:")
+    print(df_consolidado[['grupo_ou_cliente', 'tipo_agrupamento', 'faturamento', 'Classificacao']].head(10))
+
+    # Mostrar distribuição ABC
+    print(f"\n🎯 Distribuição ABC:")
+    distribuicao = df_consolidado['Classificacao'].value_counts()
+    print(distribuicao)
+
+
+registrar(Relatorio(
+    nome="clientesabc",
+    gerar=gerar,
+    gerar_offline=gerar_offline,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="Analise_Consolidada_RJ_",
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["clientesabc", *sys.argv[1:]])
@@ -0,0 +1,115 @@
+import pandas as pd
+
+import cache_fatos
+from agregacoes import agregar_clientes
+from consultas import Consulta, Filtros, filtrar_offline, ler_consulta
+from curva_abc import classificar
+from registro import Relatorio, registrar
+
+QUERY_2024 = """
+    SELECT
+        -- 👇 LÓGICA: Se grupo vazio, usa nome do cliente
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN bc.nomecliente 
+            ELSE bc.grupoeconomico 
+        END AS grupo_ou_cliente,
+        
+        COUNT(DISTINCT bc.codigocliente) AS qtd_clientes,
+        SUM(bfa.precounitario * bfa.quantidadenegociada) AS faturamento,
+        COUNT(bfa.datafaturamento) AS Qtd_Pedidos,
+        SUM(bfa.quantidadenegociada) AS Qtd_Itens_Total,
+        CEILING(SUM(bfa.quantidadenegociada) / NULLIF(COUNT(bfa.datafaturamento), 0)) AS Itens_por_Pedidos,
+        MAX(bfa.datafaturamento) AS ultima_venda,
+        
+        -- 👇 Identificar se é grupo real ou cliente individual
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN 'Cliente Individual' 
+            ELSE 'Grupo Econômico' 
+        END AS tipo_agrupamento
+
+    FROM
+        dbo.bi_fato_antigo AS bfa  -- 👈 USANDO TABELA ANTIGA
+    INNER JOIN
+        dbo.bi_cliente AS bc ON bfa.codigocliente = bc.codigocliente
+    WHERE
+        bfa.tipomovumento IN ('V', 'B'){filtros}
+    GROUP BY
+        -- 👇 Agrupar pela mesma lógica do CASE
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN bc.nomecliente 
+            ELSE bc.grupoeconomico 
+        END,
+        CASE 
+            WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = '' 
+            THEN 'Cliente Individual' 
+            ELSE 'Grupo Econômico' 
+        END
+    ORDER BY
+        faturamento DESC;
+"""
+
+
+def filtros_padrao():
+    # 👇 PERÍODO ESPECÍFICO: 01/01/2024 até 09/10/2024, clientes do RJ
+    return Filtros(
+        inicio=pd.Timestamp("2024-01-01"),
+        fim=pd.Timestamp("2024-10-10"),
+        ufs=("RJ",),
+    )
+
+
+def gerar(connect, filtros):
+    consulta = Consulta(QUERY_2024).aplicar(
+        filtros,
+        coluna_data="bfa.datafaturamento",
+        coluna_uf="bc.uf",
+        coluna_produto="bfa.codigoproduto",
+    )
+    # Executar a query
+    df_2024 = ler_consulta(connect, consulta)
+    return classificar(df_2024)
+
+
+def gerar_offline(filtros):
+    fatos = cache_fatos.ler_fatos("bi_fato_antigo", inicio=filtros.inicio, fim=filtros.fim)
+    fatos = filtrar_offline(fatos, filtros)
+    clientes = cache_fatos.ler_dimensao("bi_cliente")
+    return classificar(agregar_clientes(fatos, clientes))
+
+
+def resumir(df_2024, filtros):
+    # Verificar os dados
+    print("📊 Dados da tabela antiga carregados!")
+    print(f"Filtros: {filtros.descricao()}")
+    print(f"Total de grupos/clientes: {len(df_2024)}")
+    print(f"Grupos econômicos: {len(df_2024[df_2024['tipo_agrupamento'] == 'Grupo Econômico'])}")
+    print(f"Clientes individuais: {len(df_2024[df_2024['tipo_agrupamento'] == 'Cliente Individual'])}")
+    print(f"Faturamento total: R$ {df_2024['faturamento'].sum():,.2f}")
+    
+    print("\n📋 Top Grupos/Clientes:")
+    print(df_2024[['grupo_ou_cliente', 'tipo_agrupamento', 'faturamento', 'Classificacao']].head(10))
+
+    # Mostrar distribuição ABC
+    print(f"\n🎯 Distribuição ABC:")
+    distribuicao = df_2024['Classificacao'].value_counts()
+    print(distribuicao)
+
+
+registrar(Relatorio(
+    nome="clientescba",
+    gerar=gerar,
+    gerar_offline=gerar_offline,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="Analise_2024_RJ_",
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["clientescba", *sys.argv[1:]])
@@ -0,0 +1,260 @@
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+import cache_fatos
+from cache_fatos import DATA_CORTE_FATO
+from agregacoes import grupo_ou_cliente
+from conexao import parametros_conexao
+from consultas import (
+    Consulta,
+    Filtros,
+    adicionar_argumentos,
+    filtrar_offline,
+    ler_consulta,
+    marcas_do_banco,
+    resolver_filtros,
+    sobrescritas,
+)
+from curva_abc import classificar
+from exportacao import FORMATOS, exportar
+
+# Como cada dimensão identifica a entidade comparada
+DIMENSOES = {
+    "clientes": {
+        "join": "INNER JOIN dbo.bi_cliente AS bc ON f.codigocliente = bc.codigocliente",
+        "colunas": {
+            "grupo_ou_cliente": """
+                CASE
+                    WHEN bc.grupoeconomico IS NULL OR bc.grupoeconomico = ''
+                    THEN bc.nomecliente
+                    ELSE bc.grupoeconomico
+                END""",
+        },
+        "coluna_uf": "bc.uf",
+        "coluna_marca": None,
+    },
+    "produtos": {
+        "join": "INNER JOIN dbo.bi_produto AS bp ON f.codigoproduto = bp.codigoproduto",
+        "colunas": {
+            "codigoproduto": "f.codigoproduto",
+            "nomeproduto": "bp.nomeproduto",
+            "marca": "bp.marca",
+        },
+        "coluna_uf": None,
+        "coluna_marca": "bp.marca",
+    },
+}
+
+
+@dataclass(frozen=True)
+class Periodo:
+    rotulo: str
+    inicio: pd.Timestamp
+    # Exclusivo: inicio <= datafaturamento < fim
+    fim: pd.Timestamp
+
+    @classmethod
+    def de_texto(cls, texto):
+        """Aceita "AAAA-MM" (mês inteiro) ou "AAAA-MM-DD:AAAA-MM-DD" (fim inclusive)."""
+        if ":" in texto:
+            inicio, fim = texto.split(":", 1)
+            return cls(texto, pd.Timestamp(inicio), pd.Timestamp(fim) + pd.Timedelta(days=1))
+        mes = pd.Period(texto, freq="M")
+        return cls(texto, mes.start_time, (mes + 1).start_time)
+
+
+def segmentos(periodo):
+    """Divide o período entre bi_fato_antigo e bi_fato conforme a data de corte."""
+    partes = []
+    if periodo.inicio < DATA_CORTE_FATO:
+        partes.append(("bi_fato_antigo", periodo.inicio, min(periodo.fim, DATA_CORTE_FATO)))
+    if periodo.fim > DATA_CORTE_FATO:
+        partes.append(("bi_fato", max(periodo.inicio, DATA_CORTE_FATO), periodo.fim))
+    return partes
+
+
+def montar_consulta(periodos, dimensao, filtros=None):
+    # Um único SELECT: cada trecho período × tabela vira um ramo do UNION ALL.
+    # Os períodos são os das colunas do relatório; `filtros` só traz UF e marcas.
+    config = DIMENSOES[dimensao]
+    consulta = Consulta("")
+    ramos = []
+    for periodo in periodos:
+        # ::text: o rótulo tem o mesmo tipo em todos os ramos do UNION ALL
+        rotulo = consulta.parametro(periodo.rotulo)
+        for tabela, inicio, fim in segmentos(periodo):
+            ramos.append(f"""
+        SELECT {rotulo}::text AS periodo, codigocliente, codigoproduto,
+               precounitario * quantidadenegociada AS valor
+        FROM dbo.{tabela}
+        WHERE tipomovumento IN ('V', 'B')
+          AND datafaturamento >= {consulta.parametro(inicio.to_pydatetime())}
+          AND datafaturamento < {consulta.parametro(fim.to_pydatetime())}""")
+
+    colunas = ",\n        ".join(f"{expr} AS {nome}" for nome, expr in config["colunas"].items())
+    query = f"""
+    WITH fatos AS ({'''
+        UNION ALL'''.join(ramos)}
+    )
+    SELECT
+        f.periodo,
+        {colunas},
+        SUM(f.valor) AS faturamento
+    FROM
+        fatos AS f
+    {config['join']}
+    WHERE TRUE{{filtros}}
+    GROUP BY
+        {', '.join(str(n) for n in range(1, len(config['colunas']) + 2))}
+"""
+    # UF e marca filtram direto pela dimensão juntada ou por semi-join na outra
+    consulta.sql = query
+    return consulta.aplicar(
+        filtros or Filtros(),
+        coluna_data=None,
+        coluna_uf=config["coluna_uf"],
+        coluna_cliente="f.codigocliente",
+        coluna_marca=config["coluna_marca"],
+        coluna_produto="f.codigoproduto",
+    )
+
+
+def buscar(connect, periodos, dimensao, filtros=None):
+    filtros = filtros or Filtros()
+    if filtros.marcas:
+        filtros = resolver_filtros(filtros, marcas_do_banco(connect))
+    return ler_consulta(connect, montar_consulta(periodos, dimensao, filtros))
+
+
+def buscar_offline(periodos, dimensao, filtros=None):
+    filtros = filtros or Filtros()
+    if filtros.marcas:
+        filtros = resolver_filtros(filtros, cache_fatos.ler_dimensao("bi_produto")["marca"])
+    partes = []
+    for periodo in periodos:
+        for tabela, inicio, fim in segmentos(periodo):
+            fatos = filtrar_offline(cache_fatos.ler_fatos(tabela, inicio=inicio, fim=fim), filtros)
+            partes.append(fatos.assign(periodo=periodo.rotulo))
+    fatos = pd.concat(partes, ignore_index=True)
+    fatos["valor"] = fatos["precounitario"] * fatos["quantidadenegociada"]
+
+    if dimensao == "clientes":
+        df = fatos.merge(cache_fatos.ler_dimensao("bi_cliente"), on="codigocliente", how="inner")
+        df["grupo_ou_cliente"] = grupo_ou_cliente(df)
+    else:
+        df = fatos.merge(cache_fatos.ler_dimensao("bi_produto"), on="codigoproduto", how="inner")
+
+    chaves = ["periodo"] + list(DIMENSOES[dimensao]["colunas"])
+    return (
+        df.groupby(chaves, as_index=False, dropna=False)["valor"].sum()
+        .rename(columns={"valor": "faturamento"})
+    )
+
+
+def migracao(anterior, atual):
+    # Classe no período anterior → classe no atual; NaN significa ausente no período.
+    # Com três ou mais períodos a entidade pode faltar nos dois: migração fica NaN
+    return np.select(
+        [anterior.isna() & atual.isna(), anterior.isna(), atual.isna()],
+        [np.nan, "novo", "perdido"],
+        default=anterior.astype(str) + "→" + atual.astype(str),
+    )
+
+
+def comparar(df_longo, periodos, dimensao, limites=None):
+    """Monta uma linha por entidade com faturamento, crescimento e migração ABC entre períodos."""
+    chaves = list(DIMENSOES[dimensao]["colunas"])
+    rotulos = [periodo.rotulo for periodo in periodos]
+    df = classificar(df_longo, por=["periodo"], limites=limites)
+
+    largo = df.set_index(chaves + ["periodo"])[["faturamento", "Classificacao"]].unstack("periodo")
+    resultado = pd.DataFrame(index=largo.index)
+    for rotulo in rotulos:
+        resultado[f"faturamento_{rotulo}"] = largo.get(("faturamento", rotulo))
+    for rotulo in rotulos:
+        resultado[f"classe_{rotulo}"] = largo.get(("Classificacao", rotulo))
+
+    for anterior, atual in zip(rotulos, rotulos[1:]):
+        fat_anterior = resultado[f"faturamento_{anterior}"].astype(float)
+        fat_atual = resultado[f"faturamento_{atual}"].astype(float)
+        resultado[f"crescimento_{anterior}_{atual}"] = (
+            (fat_atual.fillna(0) - fat_anterior) / fat_anterior.replace(0, np.nan) * 100
+        )
+        resultado[f"migracao_{anterior}_{atual}"] = migracao(
+            resultado[f"classe_{anterior}"], resultado[f"classe_{atual}"]
+        )
+
+    ordem = f"faturamento_{rotulos[-1]}"
+    return resultado.reset_index().sort_values(ordem, ascending=False, na_position="last", ignore_index=True)
+
+
+def resumir(df, periodos):
+    rotulos = [periodo.rotulo for periodo in periodos]
+    print("📊 Comparativo carregado!")
+    print(f"Total de entidades: {len(df)}")
+    for rotulo in rotulos:
+        print(f"Faturamento {rotulo}: R$ {df[f'faturamento_{rotulo}'].sum():,.2f}")
+    for anterior, atual in zip(rotulos, rotulos[1:]):
+        print(f"\n🎯 Migração ABC {anterior} → {atual}:")
+        print(df[f"migracao_{anterior}_{atual}"].value_counts())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara faturamento e classe ABC entre períodos")
+    parser.add_argument("dimensao", choices=DIMENSOES)
+    parser.add_argument(
+        "periodos",
+        nargs="+",
+        type=Periodo.de_texto,
+        help='Períodos em ordem: "AAAA-MM" ou "AAAA-MM-DD:AAAA-MM-DD" (fim inclusive)',
+    )
+    parser.add_argument("--offline", action="store_true", help="Lê do cache local de fatos")
+    parser.add_argument(
+        "--limites",
+        type=float,
+        nargs="+",
+        help="Percentuais acumulados que fecham cada classe ABC (padrão: 80 95)",
+    )
+    parser.add_argument("-f", "--formato", choices=FORMATOS, default="xlsx")
+    # Os períodos já são posicionais: daqui só entram UF e marca
+    adicionar_argumentos(parser, periodo=False)
+    args = parser.parse_args(argv)
+    if len(args.periodos) < 2:
+        parser.error("Informe pelo menos dois períodos")
+    filtros = Filtros(**sobrescritas(args))
+
+    connect = None
+    try:
+        if args.offline:
+            df_longo = buscar_offline(args.periodos, args.dimensao, filtros)
+        else:
+            connect = psycopg2.connect(**parametros_conexao())
+            print("Conexão estabelecida com sucesso!")
+            df_longo = buscar(connect, args.periodos, args.dimensao, filtros)
+
+        df = comparar(df_longo, args.periodos, args.dimensao, args.limites)
+        resumir(df, args.periodos)
+
+        data_atual = datetime.now().strftime("%Y-%m-%d_%H-%M")
+        for arquivo in exportar({"comparativo": df}, f"Comparativo_{args.dimensao}_{data_atual}", args.formato):
+            print(f"✅ Arquivo exportado: {arquivo}")
+
+    except psycopg2.Error as e:
+        print("Erro ao conectar:", e)
+
+    except Exception as e:
+        print(f"Erro durante execução: {e}")
+
+    finally:
+        if connect:
+            connect.close()
+            print("Conexão fechada")
+
+
+if __name__ == "__main__":
+    main()
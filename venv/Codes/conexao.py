@@ -0,0 +1,37 @@
+import os
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from psycopg2.pool import ThreadedConnectionPool
+
+from instrumentacao import etapa
+
+load_dotenv()
+
+
+def parametros_conexao():
+    # Mesmas variáveis de ambiente usadas pelos scripts isolados
+    return {
+        "database": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+    }
+
+
+def criar_pool(max_conexoes):
+    # Pool limitado: nunca abre mais conexões do que workers em execução
+    return ThreadedConnectionPool(1, max_conexoes, **parametros_conexao())
+
+
+@contextmanager
+def conexao_do_pool(pool):
+    with etapa("conexao"):
+        conexao = pool.getconn()
+    try:
+        yield conexao
+    finally:
+        # Encerra a transação aberta pelo read_sql antes de devolver ao pool
+        conexao.rollback()
+        pool.putconn(conexao)
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import re
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+import cache_fatos
+from instrumentacao import capturar_plano, etapa
+from leitura_streaming import ler_em_blocos
+
+# Filtros dos relatórios viram predicados "sargáveis" com parâmetros:
+#   período -> datafaturamento >= $1 AND datafaturamento < $2 (usa índice de data)
+#   UFs     -> uf = ANY($3)
+#   marcas  -> marca = ANY($4), com os padrões já resolvidos para valores exatos
+# em vez de EXTRACT(...) = 9 ou UPPER(marca) LIKE '%X%', que forçam varredura completa.
+
+
+@dataclass(frozen=True)
+class Filtros:
+    inicio: pd.Timestamp | None = None
+    # Exclusivo: inicio <= datafaturamento < fim
+    fim: pd.Timestamp | None = None
+    ufs: tuple[str, ...] = ()
+    marcas: tuple[str, ...] = ()
+
+    def substituir(self, **valores):
+        return replace(self, **valores)
+
+    def descricao(self):
+        partes = []
+        if self.inicio is not None or self.fim is not None:
+            inicio = f"{self.inicio:%d/%m/%Y}" if self.inicio is not None else "início"
+            fim = f"{self.fim - pd.Timedelta(days=1):%d/%m/%Y}" if self.fim is not None else "hoje"
+            partes.append(f"{inicio} até {fim}")
+        if self.ufs:
+            partes.append("UF " + ", ".join(self.ufs))
+        if self.marcas:
+            partes.append("marcas " + ", ".join(self.marcas))
+        return " | ".join(partes) or "sem filtros"
+
+
+def mes(texto):
+    periodo = pd.Period(texto, freq="M")
+    return periodo.start_time, (periodo + 1).start_time
+
+
+def ultimos_meses(quantidade):
+    return pd.Timestamp.today().normalize() - pd.DateOffset(months=quantidade), None
+
+
+def resolver_marcas(marcas_existentes, padroes):
+    """Troca cada padrão (trecho do nome, sem diferenciar maiúsculas) pelas marcas exatas que o contêm."""
+    marcas = pd.Series(pd.unique(pd.Series(marcas_existentes).dropna()))
+    maiusculas = marcas.str.upper()
+    encontradas = set()
+    for padrao in padroes:
+        encontradas.update(marcas[maiusculas.str.contains(padrao.upper(), regex=False)])
+    return tuple(sorted(encontradas))
+
+
+def marcas_do_banco(connect):
+    with connect.cursor() as cursor:
+        cursor.execute("SELECT DISTINCT marca FROM dbo.bi_produto WHERE marca IS NOT NULL")
+        return [linha[0] for linha in cursor.fetchall()]
+
+
+def resolver_filtros(filtros, marcas_existentes):
+    if not filtros.marcas:
+        return filtros
+    marcas = resolver_marcas(marcas_existentes, filtros.marcas)
+    if not marcas:
+        raise ValueError(f"Nenhuma marca encontrada para: {', '.join(filtros.marcas)}")
+    return filtros.substituir(marcas=marcas)
+
+
+class Consulta:
+    """Monta um SQL com {filtros} substituído por predicados com parâmetros posicionais ($1, $2...)."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.condicoes = []
+        self.params = []
+
+    def parametro(self, valor):
+        self.params.append(valor)
+        return f"${len(self.params)}"
+
+    def periodo(self, coluna, inicio, fim):
+        if coluna is None:
+            return self
+        if inicio is not None:
+            self.condicoes.append(f"{coluna} >= {self.parametro(inicio.to_pydatetime())}")
+        if fim is not None:
+            self.condicoes.append(f"{coluna} < {self.parametro(fim.to_pydatetime())}")
+        return self
+
+    def em(self, coluna, valores):
+        if valores:
+            self.condicoes.append(f"{coluna} = ANY({self.parametro(list(valores))})")
+        return self
+
+    def em_subconsulta(self, coluna, tabela, chave, coluna_filtro, valores):
+        # Semi-join para filtrar por atributo de uma dimensão que a query não junta
+        if valores:
+            self.condicoes.append(
+                f"{coluna} IN (SELECT {chave} FROM {tabela} "
+                f"WHERE {coluna_filtro} = ANY({self.parametro(list(valores))}))"
+            )
+        return self
+
+    def aplicar(self, filtros, coluna_data, coluna_uf=None, coluna_cliente=None,
+                coluna_marca=None, coluna_produto=None):
+        self.periodo(coluna_data, filtros.inicio, filtros.fim)
+        if coluna_uf:
+            self.em(coluna_uf, filtros.ufs)
+        elif filtros.ufs:
+            self.em_subconsulta(coluna_cliente, "dbo.bi_cliente", "codigocliente", "uf", filtros.ufs)
+        if coluna_marca:
+            self.em(coluna_marca, filtros.marcas)
+        elif filtros.marcas:
+            self.em_subconsulta(coluna_produto, "dbo.bi_produto", "codigoproduto", "marca", filtros.marcas)
+        return self
+
+    def sql_com_filtros(self):
+        return self.sql.replace("{filtros}", "".join(f"\n        AND {c}" for c in self.condicoes))
+
+    def sql_psycopg(self):
+        """Mesmo SQL no formato do psycopg2 (%s), com os parâmetros na ordem em que aparecem."""
+        params = []
+
+        def trocar(match):
+            params.append(self.params[int(match.group(1)) - 1])
+            return "%s"
+
+        sql = re.sub(r"\$(\d+)", trocar, self.sql_com_filtros().replace("%", "%%"))
+        return sql, params
+
+
+# Lê as consultas dos relatórios em blocos por um cursor nomeado (ver ler_em_blocos)
+STREAMING = bool(int(os.getenv("RELATORIOS_STREAMING", "0")))
+
+
+def ler_consulta(connect, consulta, streaming=None):
+    """Executa a consulta com os parâmetros ligados pelo psycopg2 e devolve um DataFrame.
+
+    Sem PREPARE: cada relatório roda sua consulta uma vez por conexão, e o pool
+    é recriado a cada execução, então o plano preparado nunca seria reaproveitado.
+
+    Com `streaming` (padrão: STREAMING) o resultado vem em blocos de
+    TAMANHO_LOTE linhas, e as tuplas do fetchall nunca ficam inteiras em memória
+    ao lado do DataFrame. O DataFrame final continua inteiro.
+    """
+    sql, params = consulta.sql_psycopg()
+    # Identifica a consulta no registro do EXPLAIN, igual entre execuções
+    nome = "rel_" + hashlib.md5(sql.encode("utf-8")).hexdigest()[:20]
+
+    if STREAMING if streaming is None else streaming:
+        with etapa("conversao"):
+            return pd.concat(ler_em_blocos(connect, sql, params, consulta=nome), ignore_index=True)
+
+    with connect.cursor() as cursor:
+        # O cursor comum só volta do execute com o resultado inteiro no cliente.
+        # Sempre com lista de parâmetros (mesmo vazia), para o "%%" virar "%".
+        with etapa("execucao_e_transferencia"):
+            cursor.execute(sql, params)
+        with etapa("conversao"):
+            colunas = [descricao[0] for descricao in cursor.description]
+            df = pd.DataFrame.from_records(cursor.fetchall(), columns=colunas, coerce_float=True)
+        capturar_plano(cursor, sql, params, consulta=nome)
+        return df
+
+
+def filtrar_offline(fatos, filtros):
+    """Aplica os mesmos filtros sobre o cache local (UF via clientes, marcas via produtos)."""
+    if filtros.inicio is not None:
+        fatos = fatos[fatos["datafaturamento"] >= filtros.inicio]
+    if filtros.fim is not None:
+        fatos = fatos[fatos["datafaturamento"] < filtros.fim]
+    if filtros.ufs:
+        clientes = cache_fatos.ler_dimensao("bi_cliente")
+        codigos = clientes.loc[clientes["uf"].isin(filtros.ufs), "codigocliente"]
+        fatos = fatos[fatos["codigocliente"].isin(codigos)]
+    if filtros.marcas:
+        produtos = cache_fatos.ler_dimensao("bi_produto")
+        codigos = produtos.loc[produtos["marca"].isin(filtros.marcas), "codigoproduto"]
+        fatos = fatos[fatos["codigoproduto"].isin(codigos)]
+    return fatos
+
+
+def adicionar_argumentos(parser, periodo=True):
+    """Opções de filtro; `periodo=False` deixa de fora as de data (ex.: comparativo.py)."""
+    grupo = parser.add_argument_group("filtros (substituem os padrões de cada relatório)")
+    if periodo:
+        # Um jeito de informar o período por vez; --fim acompanha --inicio (ver conferir_argumentos)
+        exclusivos = grupo.add_mutually_exclusive_group()
+        exclusivos.add_argument("--mes", help="Mês inteiro, AAAA-MM")
+        exclusivos.add_argument("--ultimos-meses", type=int, help="Últimos N meses até hoje")
+        exclusivos.add_argument("--inicio", help="Data inicial, AAAA-MM-DD")
+        grupo.add_argument("--fim", help="Data final (inclusive), AAAA-MM-DD; sozinho ou com --inicio")
+    grupo.add_argument("--uf", action="append", help="UF do cliente (pode repetir)")
+    grupo.add_argument(
+        "--marca",
+        action="append",
+        help="Marca ou trecho do nome, sem diferenciar maiúsculas (pode repetir)",
+    )
+
+
+def conferir_argumentos(parser, args):
+    if getattr(args, "fim", None) and (getattr(args, "mes", None) or getattr(args, "ultimos_meses", None)):
+        parser.error("argument --fim: not allowed with argument --mes/--ultimos-meses")
+
+
+def sobrescritas(args):
+    """Campos de Filtros informados na linha de comando; os ausentes mantêm o padrão do relatório."""
+    valores = {}
+    if args.uf:
+        valores["ufs"] = tuple(uf.upper() for uf in args.uf)
+    if args.marca:
+        valores["marcas"] = tuple(args.marca)
+    inicio, fim = getattr(args, "inicio", None), getattr(args, "fim", None)
+    if getattr(args, "mes", None):
+        valores["inicio"], valores["fim"] = mes(args.mes)
+    elif getattr(args, "ultimos_meses", None):
+        valores["inicio"], valores["fim"] = ultimos_meses(args.ultimos_meses)
+    elif inicio or fim:
+        valores["inicio"] = pd.Timestamp(inicio) if inicio else None
+        valores["fim"] = pd.Timestamp(fim) + pd.Timedelta(days=1) if fim else None
+    return valores
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+
+def ler_limites(texto):
+    return tuple(float(limite) for limite in texto.replace(",", " ").split())
+
+
+# Curva ABC (Pareto) compartilhada pelos relatórios.
+# `limites` são os percentuais acumulados que fecham cada classe: com (80, 95)
+# fica A até 80%, B até 95% e C no restante. Para A/B/C/D basta passar três
+# limites, por exemplo (70, 90, 97): ABC_LIMITES=70,90,97 ou --limites 70 90 97
+# no executar_relatorios.py e no comparativo.py.
+LIMITES_PADRAO = ler_limites(os.getenv("ABC_LIMITES", "80,95"))
+
+
+def _validar(limites):
+    if not limites or list(limites) != sorted(limites) or not 0 < limites[0] <= limites[-1] <= 100:
+        raise ValueError(f"Limites da curva ABC devem ser crescentes e entre 0 e 100: {limites}")
+
+
+def _classes_para(limites, classes):
+    if classes is None:
+        return tuple("ABCDEFGHIJ"[:len(limites) + 1])
+    if len(classes) != len(limites) + 1:
+        raise ValueError("É preciso uma classe a mais do que a quantidade de limites")
+    return tuple(classes)
+
+
+def classificar(df, valor="faturamento", limites=None, classes=None, por=None):
+    """Ordena por `valor` e adiciona PorcentAcumulado e Classificacao.
+
+    Com `por` (ex.: ["mes", "uf"]) cada combinação é uma curva independente,
+    calculada em uma única passada agrupada. Sem `limites`, usa LIMITES_PADRAO.
+    """
+    # Lido na chamada, para valer o --limites da linha de comando
+    limites = LIMITES_PADRAO if limites is None else tuple(limites)
+    _validar(limites)
+    classes = _classes_para(limites, classes)
+    por = list(por or [])
+
+    df = df.sort_values(por + [valor], ascending=[True] * len(por) + [False])
+    # SUM de NUMERIC chega do psycopg2 como Decimal (dtype object)
+    valores = df[valor].astype(float)
+    if por:
+        grupos = valores.groupby([df[coluna] for coluna in por], sort=False, dropna=False)
+        acumulado = grupos.cumsum()
+        total = grupos.transform("sum")
+    else:
+        acumulado = valores.cumsum()
+        total = valores.sum()
+    df["PorcentAcumulado"] = acumulado / total * 100
+
+    # searchsorted com side="left" reproduz o "p <= limite" da classificação antiga
+    posicao = np.searchsorted(
+        np.asarray(limites, dtype=float),
+        df["PorcentAcumulado"].to_numpy(dtype=float),
+        side="left",
+    )
+    df["Classificacao"] = np.asarray(classes, dtype=object)[posicao]
+    return df
+
+
+def agregar_e_classificar(df, chave, valor="faturamento", limites=None, classes=None, por=None):
+    """Soma `valor` por `chave` (dentro de cada grupo de `por`) e classifica.
+
+    Recebe um DataFrame em formato longo, por exemplo uma linha por venda com
+    colunas mes, uf, marca e faturamento.
+    """
+    por = list(por or [])
+    chaves = por + ([chave] if isinstance(chave, str) else list(chave))
+    agregado = df.groupby(chaves, as_index=False, dropna=False, observed=True)[valor].sum()
+    return classificar(agregado, valor=valor, limites=limites, classes=classes, por=por)
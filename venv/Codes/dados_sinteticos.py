@@ -0,0 +1,254 @@
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from cache_fatos import DATA_CORTE_FATO
+from conexao import parametros_conexao
+
+# Base sintética com o mesmo formato das tabelas dbo.* usadas pelos relatórios,
+# para medir desempenho sem acesso ao banco de produção. Tudo sai de uma
+# semente: a mesma semente, a mesma quantidade de linhas e a mesma data geram
+# os mesmos dados. O histórico termina hoje porque os filtros padrão dos
+# relatórios são relativos à data atual (mês corrente, últimos 3 meses...).
+#
+# O carregamento APAGA o schema dbo do banco apontado pelas variáveis DB_*.
+# Para não destruir um banco de verdade, só apaga um dbo criado por este script
+# (marcado pela tabela dbo._sintetico).
+
+DDL = """
+    CREATE SCHEMA dbo;
+    CREATE TABLE dbo._sintetico (linhas_fato bigint, semente bigint, data_referencia date);
+    CREATE TABLE dbo.bi_cliente (
+        codigocliente integer PRIMARY KEY, nomecliente text, grupoeconomico text, uf varchar(2)
+    );
+    CREATE TABLE dbo.bi_produto (codigoproduto integer PRIMARY KEY, nomeproduto text, marca text);
+    CREATE TABLE dbo.produtobase (
+        codigoprincipal integer PRIMARY KEY, permitecompra boolean, permitevenda boolean, inativo boolean
+    );
+    CREATE TABLE dbo.bi_vendedor (codigovendedor integer PRIMARY KEY, nomerepresentante text);
+    CREATE TABLE dbo.bi_estoque (codigoprincipal integer, data date, estoquenadata numeric(18, 4));
+    CREATE TABLE dbo.bi_fato (
+        codigocliente integer,
+        codigoproduto integer,
+        codigovendedor integer,
+        tipomovumento char(1),
+        datafaturamento timestamp,
+        precounitario numeric(18, 4),
+        quantidadenegociada numeric(18, 4)
+    );
+    CREATE TABLE dbo.bi_fato_antigo (LIKE dbo.bi_fato);
+"""
+
+# Criados depois da carga, que fica bem mais rápida sem índices
+INDICES = """
+    CREATE INDEX ON dbo.bi_fato (datafaturamento);
+    CREATE INDEX ON dbo.bi_fato_antigo (datafaturamento);
+    CREATE INDEX ON dbo.bi_estoque (codigoprincipal, data);
+    ANALYZE;
+"""
+
+UFS = (
+    "RJ", "SP", "MG", "ES", "BA", "PR", "SC", "RS", "GO", "DF", "PE", "CE", "PA", "AM",
+    "MA", "PB", "RN", "AL", "SE", "PI", "MT", "MS", "RO", "TO", "AC", "AP", "RR",
+)
+
+# Inclui as grafias que as regras de marca (marcas.py) precisam unificar
+MARCAS_REAIS = ("MECTRONIC", "Mectronic", "FORTLEV", "HYDRONORTH", "hydronorth sa", "HYDRONORTH TUBOS")
+
+# Anos de histórico em bi_fato_antigo antes da data de corte
+ANOS_ANTIGO = 2
+
+TAMANHO_BLOCO = 1_000_000
+
+
+def _tamanhos(linhas_fato):
+    # Dimensões crescem com os fatos, mas bem mais devagar, como na base real
+    return {
+        "clientes": max(200, linhas_fato // 100),
+        "produtos": max(100, linhas_fato // 500),
+        "vendedores": min(200, max(10, linhas_fato // 50_000)),
+    }
+
+
+def _pesos(rng, quantidade):
+    # Poucos itens concentram a maior parte das vendas (curva ABC realista)
+    pesos = rng.pareto(1.2, quantidade) + 1
+    return pesos / pesos.sum()
+
+
+def gerar_dimensoes(linhas_fato, semente=42):
+    tamanhos = _tamanhos(linhas_fato)
+    rng = np.random.default_rng([semente, 0])
+
+    n = tamanhos["clientes"]
+    grupos = np.array([f"GRUPO {i:04d}" for i in range(max(1, n // 20))] + ["BMB MATERIAL"])
+    em_grupo = rng.random(n) < 0.3
+    clientes = pd.DataFrame({
+        "codigocliente": np.arange(1, n + 1),
+        "nomecliente": [f"CLIENTE {i:07d}" for i in range(1, n + 1)],
+        "grupoeconomico": np.where(em_grupo, rng.choice(grupos, n), None),
+        "uf": rng.choice(UFS, n, p=_pesos(np.random.default_rng([semente, 1]), len(UFS))),
+    })
+
+    n = tamanhos["produtos"]
+    marcas = np.array(MARCAS_REAIS + tuple(f"MARCA {i:02d}" for i in range(40)))
+    produtos = pd.DataFrame({
+        "codigoproduto": np.arange(1, n + 1),
+        "nomeproduto": [f"PRODUTO {i:07d}" for i in range(1, n + 1)],
+        "marca": rng.choice(marcas, n),
+    })
+    produtobase = pd.DataFrame({
+        "codigoprincipal": produtos["codigoproduto"],
+        "permitecompra": rng.random(n) < 0.9,
+        "permitevenda": rng.random(n) < 0.95,
+        "inativo": rng.random(n) < 0.05,
+    })
+
+    n = tamanhos["vendedores"]
+    vendedores = pd.DataFrame({
+        "codigovendedor": np.arange(1, n + 1),
+        "nomerepresentante": [f"REPRESENTANTE {i:03d}" for i in range(1, n + 1)],
+    })
+
+    # Algumas posições de estoque por produto ao longo de todo o histórico
+    inicio = DATA_CORTE_FATO - pd.DateOffset(years=ANOS_ANTIGO)
+    dias = (pd.Timestamp.today().normalize() - inicio).days
+    por_produto = rng.integers(1, 60, len(produtos))
+    estoque = pd.DataFrame({
+        "codigoprincipal": np.repeat(produtos["codigoproduto"].to_numpy(), por_produto),
+        "data": inicio + pd.to_timedelta(rng.integers(0, dias, por_produto.sum()), unit="D"),
+        "estoquenadata": rng.integers(0, 500, por_produto.sum()),
+    })
+
+    return {
+        "bi_cliente": clientes,
+        "bi_produto": produtos,
+        "produtobase": produtobase,
+        "bi_vendedor": vendedores,
+        "bi_estoque": estoque,
+    }
+
+
+def periodos_fato():
+    """(tabela, início, fim) de cada tabela de fato, divididas na data de corte."""
+    return [
+        ("bi_fato_antigo", DATA_CORTE_FATO - pd.DateOffset(years=ANOS_ANTIGO), DATA_CORTE_FATO),
+        ("bi_fato", DATA_CORTE_FATO, pd.Timestamp.today().normalize() + pd.Timedelta(days=1)),
+    ]
+
+
+def gerar_fatos(linhas_fato, dimensoes, semente=42):
+    """Gera (tabela, bloco) com `linhas_fato` linhas no total, divididas pelo tamanho de cada período."""
+    periodos = periodos_fato()
+    duracoes = np.array([(fim - inicio).total_seconds() for _, inicio, fim in periodos])
+    linhas_por_tabela = np.round(linhas_fato * duracoes / duracoes.sum()).astype(int)
+
+    pesos_rng = np.random.default_rng([semente, 2])
+    clientes = dimensoes["bi_cliente"]["codigocliente"].to_numpy()
+    produtos = dimensoes["bi_produto"]["codigoproduto"].to_numpy()
+    vendedores = dimensoes["bi_vendedor"]["codigovendedor"].to_numpy()
+    pesos_clientes = _pesos(pesos_rng, len(clientes))
+    pesos_produtos = _pesos(pesos_rng, len(produtos))
+    precos = np.round(pesos_rng.lognormal(3, 1, len(produtos)), 2)
+
+    for t, ((tabela, inicio, fim), linhas) in enumerate(zip(periodos, linhas_por_tabela)):
+        segundos = int((fim - inicio).total_seconds())
+        for b, comeco in enumerate(range(0, linhas, TAMANHO_BLOCO)):
+            # Semente própria por bloco: o resultado não depende do tamanho do bloco anterior
+            rng = np.random.default_rng([semente, 3, t, b])
+            n = min(TAMANHO_BLOCO, linhas - comeco)
+            produto = rng.choice(len(produtos), n, p=pesos_produtos)
+            yield tabela, pd.DataFrame({
+                "codigocliente": rng.choice(clientes, n, p=pesos_clientes),
+                "codigoproduto": produtos[produto],
+                "codigovendedor": rng.choice(vendedores, n),
+                "tipomovumento": rng.choice(["V", "B", "D"], n, p=[0.85, 0.05, 0.10]),
+                "datafaturamento": inicio + pd.to_timedelta(rng.integers(0, segundos, n), unit="s"),
+                "precounitario": np.round(precos[produto] * rng.uniform(0.9, 1.1, n), 2),
+                "quantidadenegociada": rng.integers(1, 50, n),
+            })
+
+
+def _copiar(cursor, tabela, df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    # copy_from não aceita nome com schema; COPY ... FROM STDIN aceita
+    cursor.copy_expert(f"COPY dbo.{tabela} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def carregada(connect):
+    """(linhas_fato, semente, data_referencia) da base sintética atual, ou None se não houver."""
+    with connect.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('dbo._sintetico'), to_regnamespace('dbo')")
+        marcador, schema = cursor.fetchone()
+        if marcador is None:
+            if schema is not None:
+                raise RuntimeError(
+                    "O banco já tem um schema dbo que não foi criado por dados_sinteticos.py; "
+                    "aponte DB_* para um banco de testes"
+                )
+            return None
+        cursor.execute("SELECT linhas_fato, semente, data_referencia FROM dbo._sintetico")
+        return cursor.fetchone()
+
+
+def carregar(connect, linhas_fato, semente=42, forcar=False):
+    """Recria o schema dbo com dados sintéticos; não faz nada se já estiver carregado igual."""
+    hoje = pd.Timestamp.today().date()
+    if carregada(connect) == (linhas_fato, semente, hoje) and not forcar:
+        print(f"ℹ️ Base sintética com {linhas_fato:,} fatos (semente {semente}) já carregada")
+        return False
+
+    print(f"🔄 Gerando base sintética com {linhas_fato:,} fatos (semente {semente})...")
+    dimensoes = gerar_dimensoes(linhas_fato, semente)
+    with connect.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS dbo CASCADE")
+        cursor.execute(DDL)
+        for tabela, df in dimensoes.items():
+            _copiar(cursor, tabela, df)
+            print(f"   {tabela}: {len(df):,} linhas")
+        for tabela, bloco in gerar_fatos(linhas_fato, dimensoes, semente):
+            _copiar(cursor, tabela, bloco)
+            print(f"   {tabela}: +{len(bloco):,} linhas")
+        cursor.execute(INDICES)
+        cursor.execute(
+            "INSERT INTO dbo._sintetico VALUES (%s, %s, %s)", (linhas_fato, semente, hoje)
+        )
+    connect.commit()
+    print("✅ Base sintética carregada")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Carrega uma base sintética dbo.* no banco de testes apontado por DB_*"
+    )
+    parser.add_argument("linhas", type=int, help="Total de linhas de fato (bi_fato + bi_fato_antigo)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--forcar", action="store_true", help="Recarrega mesmo que já esteja igual")
+    args = parser.parse_args(argv)
+
+    connect = None
+    try:
+        connect = psycopg2.connect(**parametros_conexao())
+        print("Conexão estabelecida com sucesso!")
+        carregar(connect, args.linhas, args.semente, args.forcar)
+
+    except psycopg2.Error as e:
+        print("Erro ao conectar:", e)
+
+    except RuntimeError as e:
+        print(f"❌ {e}")
+
+    finally:
+        if connect:
+            connect.close()
+            print("Conexão fechada")
+
+
+if __name__ == "__main__":
+    main()
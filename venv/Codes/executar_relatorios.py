@@ -0,0 +1,297 @@
+import argparse
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import psycopg2
+
+import cache_fatos
+import consultas
+import curva_abc
+from cache_fatos import CacheIndisponivel
+from conexao import conexao_do_pool, criar_pool
+from consultas import (
+    adicionar_argumentos,
+    conferir_argumentos,
+    marcas_do_banco,
+    resolver_filtros,
+    sobrescritas,
+)
+from exportacao import FORMATOS, exportar
+from instrumentacao import Medicao, gravar_registros, rastrear_memoria
+from registro import RELATORIOS
+
+# Módulos que registram relatórios ao serem importados
+MODULOS_RELATORIOS = (
+    "abcufmensal",
+    "clientesabc",
+    "clientescba",
+    "extratovendas",
+    "pmarca",
+    "produtosabc",
+    "produtosabcantigo",
+)
+
+# Configurações do pandas
+pd.set_option('display.max_columns', None)
+pd.set_option('display.expand_frame_repr', False)
+pd.set_option('display.width', None)
+
+
+def carregar_relatorios():
+    for modulo in MODULOS_RELATORIOS:
+        importlib.import_module(modulo)
+    return RELATORIOS
+
+
+# Registro das execuções (uma linha JSON por relatório), para comparar tempos entre versões
+ARQUIVO_REGISTRO = "execucoes.jsonl"
+
+
+def _gerar(pool, relatorio, filtros, medicao):
+    with medicao.ativa():
+        with conexao_do_pool(pool) as conexao:
+            return relatorio.gerar(conexao, filtros)
+
+
+def _gerar_offline(relatorio, filtros, medicao):
+    with medicao.ativa():
+        return relatorio.gerar_offline(filtros)
+
+
+def _resolver_marcas(filtros, buscar_marcas):
+    # Padrões de marca viram valores exatos uma vez só, antes de disparar os relatórios
+    if not any(f.marcas for f in filtros.values()):
+        return filtros
+    marcas = buscar_marcas()
+    return {nome: resolver_filtros(f, marcas) for nome, f in filtros.items()}
+
+
+def exportar_resultados(relatorios, resultados, formato="xlsx", arquivo_unico=False, medicoes=None):
+    data_atual = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    if arquivo_unico:
+        # Uma aba por relatório, gravadas em uma única passada
+        inicio = time.perf_counter()
+        arquivos = exportar(resultados, f"Relatorios_{data_atual}", formato)
+        duracao = time.perf_counter() - inicio
+    else:
+        arquivos, duracao = [], None
+        for nome, df in resultados.items():
+            caminho_base = f"{relatorios[nome].prefixo_arquivo}{data_atual}"
+            medicao = medicoes[nome] if medicoes else Medicao(nome)
+            with medicao.medir("exportacao"):
+                arquivos += exportar({nome: df}, caminho_base, formato)
+    for arquivo in arquivos:
+        print(f"✅ Arquivo exportado: {arquivo}")
+    return duracao
+
+
+def _coletar(executor, tarefas, resultados, medicoes):
+    futuros = {executor.submit(*tarefa): nome for nome, tarefa in tarefas.items()}
+    for futuro in as_completed(futuros):
+        nome = futuros[futuro]
+        try:
+            df = futuro.result()
+        except psycopg2.Error as e:
+            medicoes[nome].erro = str(e)
+            print(f"❌ Erro de banco no relatório {nome}: {e}")
+            continue
+        except CacheIndisponivel as e:
+            medicoes[nome].erro = str(e)
+            print(f"❌ Cache indisponível para o relatório {nome}: {e}")
+            continue
+        except Exception as e:
+            medicoes[nome].erro = str(e)
+            print(f"❌ Erro durante execução do relatório {nome}: {e}")
+            continue
+        medicoes[nome].linhas = len(df)
+        print(f"⏱️ {nome} concluído em {medicoes[nome].total:.1f}s ({medicoes[nome].resumo()})")
+        resultados[nome] = df
+
+
+def executar(nomes, workers, offline=False, formato="xlsx", arquivo_unico=False, filtros_cli=None,
+             memoria=False, explain=False, registro=ARQUIVO_REGISTRO, contexto=None):
+    """Gera, resume e exporta os relatórios; devolve {nome: DataFrame}.
+
+    Tempos por etapa sempre são medidos. `memoria` liga o tracemalloc (mais
+    lento; com vários workers os picos se misturam entre relatórios),
+    `explain` guarda o EXPLAIN (ANALYZE, BUFFERS) de cada consulta e
+    `registro` é o arquivo JSON Lines que recebe os resultados (None desliga).
+    `contexto` entra em todas as linhas do registro (ex.: escala do benchmark).
+    """
+    relatorios = carregar_relatorios()
+    desconhecidos = [nome for nome in nomes if nome not in relatorios]
+    if desconhecidos:
+        raise ValueError(f"Relatórios desconhecidos: {', '.join(desconhecidos)}")
+    filtros = {
+        nome: relatorios[nome].filtros_padrao().substituir(**(filtros_cli or {}))
+        for nome in nomes
+    }
+    medicoes = {
+        nome: Medicao(nome, filtros[nome], memoria=memoria, explain=explain and not offline)
+        for nome in nomes
+    }
+    with rastrear_memoria(memoria):
+        resultados, exportacao_unica = _executar(
+            relatorios, nomes, workers, offline, formato, arquivo_unico, filtros, medicoes
+        )
+
+    if registro:
+        gravar_registros(
+            registro,
+            medicoes.values(),
+            modo="offline" if offline else "online",
+            workers=workers,
+            formato=formato,
+            exportacao_arquivo_unico_s=exportacao_unica,
+            **(contexto or {}),
+        )
+        print(f"📝 Tempos registrados em {registro}")
+    return resultados
+
+
+def _executar(relatorios, nomes, workers, offline, formato, arquivo_unico, filtros, medicoes):
+    resultados = {}
+    if offline:
+        sem_offline = [nome for nome in nomes if relatorios[nome].gerar_offline is None]
+        if sem_offline:
+            raise ValueError(f"Relatórios sem modo offline: {', '.join(sem_offline)}")
+        print("📦 Modo offline: lendo do cache local de fatos")
+        filtros = _resolver_marcas(
+            filtros, lambda: cache_fatos.ler_dimensao("bi_produto")["marca"]
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tarefas = {
+                nome: (_gerar_offline, relatorios[nome], filtros[nome], medicoes[nome])
+                for nome in nomes
+            }
+            _coletar(executor, tarefas, resultados, medicoes)
+    else:
+        try:
+            pool = criar_pool(workers)
+        except psycopg2.Error as e:
+            print("Erro ao conectar:", e)
+            return resultados, None
+        print(f"Pool de conexões criado ({workers} conexões no máximo)")
+        try:
+            with conexao_do_pool(pool) as conexao:
+                filtros = _resolver_marcas(filtros, lambda: marcas_do_banco(conexao))
+            # As consultas rodam em paralelo; o psycopg2 libera o GIL enquanto espera o servidor
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                tarefas = {
+                    nome: (_gerar, pool, relatorios[nome], filtros[nome], medicoes[nome])
+                    for nome in nomes
+                }
+                _coletar(executor, tarefas, resultados, medicoes)
+        finally:
+            pool.closeall()
+            print("Conexões fechadas")
+
+    # Resumo em sequência para não misturar a saída no console
+    resultados = {nome: resultados[nome] for nome in nomes if nome in resultados}
+    for nome, df in resultados.items():
+        print(f"\n===== {nome} =====")
+        relatorios[nome].resumir(df, filtros[nome])
+
+    print()
+    exportacao_unica = exportar_resultados(relatorios, resultados, formato, arquivo_unico, medicoes)
+    return resultados, exportacao_unica
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa os relatórios em paralelo")
+    parser.add_argument(
+        "relatorios",
+        nargs="*",
+        help="Relatórios a executar (padrão: todos, exceto os extratos)",
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=4,
+        help="Número de consultas simultâneas / tamanho do pool (padrão: 4)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Gera os relatórios a partir do cache local (ver cache_fatos.py)",
+    )
+    parser.add_argument(
+        "-f", "--formato",
+        choices=FORMATOS,
+        default="xlsx",
+        help="Formato dos arquivos exportados (padrão: xlsx). O extrato linha a linha do "
+             "extratovendas é sempre CSV; só o resumo dele segue este formato",
+    )
+    parser.add_argument(
+        "--arquivo-unico",
+        action="store_true",
+        help="Grava todos os relatórios em um só arquivo xlsx, uma aba por relatório",
+    )
+    parser.add_argument(
+        "--memoria",
+        action="store_true",
+        help="Mede o pico de memória de cada etapa (tracemalloc; deixa a execução mais lenta). "
+             "O tracemalloc não vê buffers do pyarrow e da libpq: o registro traz também o pico "
+             "de memória residente do processo inteiro",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Guarda o EXPLAIN (ANALYZE, BUFFERS) de cada consulta no registro (executa as consultas de novo)",
+    )
+    parser.add_argument(
+        "--registro",
+        default=ARQUIVO_REGISTRO,
+        help=f"Arquivo JSON Lines com os tempos de cada execução (padrão: {ARQUIVO_REGISTRO}; vazio desliga)",
+    )
+    parser.add_argument(
+        "--limites",
+        type=float,
+        nargs="+",
+        help="Percentuais acumulados que fecham cada classe da curva ABC, ex.: 70 90 97 para A/B/C/D "
+             "(padrão: ABC_LIMITES ou 80 95)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Lê as consultas dos relatórios em blocos por cursor nomeado, sem trazer o "
+             "resultado inteiro de uma vez (padrão: RELATORIOS_STREAMING=1)",
+    )
+    adicionar_argumentos(parser)
+    args = parser.parse_args(argv)
+    conferir_argumentos(parser, args)
+    if args.arquivo_unico and args.formato != "xlsx":
+        parser.error("--arquivo-unico só é suportado com --formato xlsx")
+
+    if args.limites:
+        curva_abc.LIMITES_PADRAO = tuple(args.limites)
+    if args.streaming:
+        consultas.STREAMING = True
+
+    nomes = args.relatorios or [
+        nome for nome, relatorio in carregar_relatorios().items()
+        if relatorio.padrao and (not args.offline or relatorio.gerar_offline)
+    ]
+    inicio = time.perf_counter()
+    try:
+        executar(
+            nomes,
+            max(1, min(args.workers, len(nomes))),
+            offline=args.offline,
+            formato=args.formato,
+            arquivo_unico=args.arquivo_unico,
+            filtros_cli=sobrescritas(args),
+            memoria=args.memoria,
+            explain=args.explain,
+            registro=args.registro or None,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+    print(f"\nFim da execução ({time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
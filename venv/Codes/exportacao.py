@@ -0,0 +1,127 @@
+import pandas as pd
+from openpyxl import Workbook
+
+# Exportação em streaming: cada aba recebe um DataFrame ou um iterável de
+# DataFrames (ex.: ler_em_blocos) e as linhas são gravadas bloco a bloco, sem
+# montar o arquivo inteiro em memória.
+FORMATOS = ("xlsx", "parquet", "csv")
+
+# Limite de linhas de uma planilha do Excel (incluindo o cabeçalho)
+MAX_LINHAS_XLSX = 1_048_576
+
+# O xlsx converte cada bloco para objetos Python (várias vezes o tamanho do
+# DataFrame); fatiar limita essa cópia a algumas milhares de linhas por vez
+TAMANHO_BLOCO_XLSX = 10_000
+
+
+def _blocos(dados, tamanho=None):
+    blocos = [dados] if isinstance(dados, pd.DataFrame) else dados
+    for bloco in blocos:
+        if tamanho is None:
+            yield bloco
+        else:
+            for inicio in range(0, len(bloco), tamanho):
+                yield bloco.iloc[inicio:inicio + tamanho]
+
+
+def _linhas(bloco):
+    # NaN/NaT/NA viram célula vazia; o restante vai como objeto Python.
+    # Uma coluna por vez, sem copiar o bloco inteiro para object.
+    colunas = []
+    for _, coluna in bloco.items():
+        valores = coluna.to_numpy(dtype=object)
+        nulos = coluna.isna().to_numpy()
+        if nulos.any():
+            valores[nulos] = None
+        colunas.append(valores)
+    return zip(*colunas)
+
+
+def _nome_aba(nome, parte):
+    sufixo = f"_{parte}" if parte > 1 else ""
+    return f"{nome[:31 - len(sufixo)]}{sufixo}"
+
+
+def exportar_xlsx(abas, caminho):
+    # write_only grava as linhas direto no arquivo temporário do openpyxl.
+    # Quase todo o tempo é do openpyxl montando cada célula; com o lxml instalado
+    # ele serializa bem mais rápido (cerca de 40% a menos em 100 mil linhas).
+    workbook = Workbook(write_only=True)
+    for nome, dados in abas.items():
+        parte, planilha, linhas_na_aba = 0, None, MAX_LINHAS_XLSX
+        for bloco in _blocos(dados, TAMANHO_BLOCO_XLSX):
+            for linha in _linhas(bloco):
+                # Planilha cheia: continua em uma nova aba com o mesmo cabeçalho
+                if linhas_na_aba >= MAX_LINHAS_XLSX:
+                    parte += 1
+                    planilha = workbook.create_sheet(_nome_aba(nome, parte))
+                    planilha.append(list(bloco.columns))
+                    linhas_na_aba = 1
+                planilha.append(linha)
+                linhas_na_aba += 1
+        if planilha is None:
+            # Relatório vazio: mantém a aba só com o cabeçalho, como o to_excel fazia
+            planilha = workbook.create_sheet(_nome_aba(nome, 1))
+            if isinstance(dados, pd.DataFrame):
+                planilha.append(list(dados.columns))
+    workbook.save(caminho)
+
+
+def _esquema_parquet(bloco):
+    import pyarrow as pa
+
+    esquema = pa.Schema.from_pandas(bloco, preserve_index=False)
+    # Coluna só com nulos no primeiro bloco sai com o tipo null, que não aceita
+    # os valores dos blocos seguintes: grava como texto
+    for i, campo in enumerate(esquema):
+        if pa.types.is_null(campo.type):
+            esquema = esquema.set(i, campo.with_type(pa.string()))
+    return esquema
+
+
+def exportar_parquet(dados, caminho, esquema=None):
+    """Sem `esquema`, os tipos saem do primeiro bloco (colunas só com nulos viram texto)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloco in _blocos(dados):
+            if escritor is None:
+                esquema = esquema or _esquema_parquet(bloco)
+                escritor = pq.ParquetWriter(caminho, esquema)
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+    if escritor is None and isinstance(dados, pd.DataFrame):
+        dados.to_parquet(caminho, index=False)
+
+
+def exportar_csv(dados, caminho):
+    with open(caminho, "w", encoding="utf-8-sig", newline="") as arquivo:
+        for i, bloco in enumerate(_blocos(dados)):
+            bloco.to_csv(arquivo, header=i == 0, index=False)
+
+
+def exportar(abas, caminho_base, formato="xlsx"):
+    """Exporta {nome: dados} e devolve a lista de arquivos gerados.
+
+    Em xlsx todas as abas vão para um único arquivo; em parquet e csv cada aba
+    vira um arquivo (com o nome da aba no sufixo quando houver mais de uma).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+    if formato == "xlsx":
+        caminho = f"{caminho_base}.xlsx"
+        exportar_xlsx(abas, caminho)
+        return [caminho]
+
+    exportador = exportar_parquet if formato == "parquet" else exportar_csv
+    arquivos = []
+    for nome, dados in abas.items():
+        caminho = f"{caminho_base}.{formato}" if len(abas) == 1 else f"{caminho_base}_{nome}.{formato}"
+        exportador(dados, caminho)
+        arquivos.append(caminho)
+    return arquivos
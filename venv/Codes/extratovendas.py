@@ -0,0 +1,133 @@
+from datetime import datetime
+
+import numpy as np
+
+from consultas import Consulta, Filtros, ler_consulta, ultimos_meses
+from exportacao import exportar_csv
+from instrumentacao import etapa
+from leitura_streaming import AgregadorIncremental, ler_em_blocos
+from registro import Relatorio, registrar
+
+# Extrato linha a linha (sem GROUP BY): o resultado pode ter milhões de linhas,
+# então é lido em blocos por um cursor no servidor e gravado direto no arquivo.
+# Sempre em CSV, qualquer que seja o --formato, porque pode passar do limite de
+# linhas do xlsx; o resumo por cliente segue o --formato.
+QUERY_EXTRATO = """
+    SELECT
+        bf.datafaturamento,
+        bf.codigocliente,
+        bc.nomecliente,
+        bc.uf,
+        bf.codigoproduto,
+        bp.nomeproduto,
+        bp.marca,
+        bf.codigovendedor,
+        bf.quantidadenegociada,
+        bf.precounitario,
+        bf.precounitario * bf.quantidadenegociada AS faturamento
+    FROM
+        dbo.bi_fato AS bf
+    INNER JOIN
+        dbo.bi_cliente AS bc ON bf.codigocliente = bc.codigocliente
+    INNER JOIN
+        dbo.bi_produto AS bp ON bf.codigoproduto = bp.codigoproduto
+    WHERE
+        bf.tipomovumento IN ('V', 'B'){filtros}
+"""
+
+# Produtos distintos por cliente: somar bloco a bloco exigiria guardar todos os
+# pares cliente × produto, então o servidor conta com os mesmos filtros e joins
+QUERY_PRODUTOS_POR_CLIENTE = """
+    SELECT
+        bf.codigocliente,
+        COUNT(DISTINCT bf.codigoproduto) AS qtd_produtos
+    FROM
+        dbo.bi_fato AS bf
+    INNER JOIN
+        dbo.bi_cliente AS bc ON bf.codigocliente = bc.codigocliente
+    INNER JOIN
+        dbo.bi_produto AS bp ON bf.codigoproduto = bp.codigoproduto
+    WHERE
+        bf.tipomovumento IN ('V', 'B'){filtros}
+    GROUP BY
+        bf.codigocliente
+"""
+
+
+def _somando(blocos, agregador):
+    for bloco in blocos:
+        agregador.adicionar(bloco)
+        yield bloco
+
+
+def _consulta(sql, filtros):
+    return Consulta(sql).aplicar(
+        filtros,
+        coluna_data="bf.datafaturamento",
+        coluna_uf="bc.uf",
+        coluna_marca="bp.marca",
+    )
+
+
+def filtros_padrao():
+    inicio, fim = ultimos_meses(3)
+    return Filtros(inicio=inicio, fim=fim)
+
+
+def gerar(connect, filtros):
+    data_atual = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    nome_arquivo = f"Extrato_Vendas_{data_atual}.csv"
+
+    # Resumo por cliente acumulado bloco a bloco, sem guardar as linhas
+    agregador = AgregadorIncremental(
+        chaves=["codigocliente", "nomecliente", "uf"],
+        somas=["faturamento", "quantidadenegociada"],
+        contagens=["datafaturamento"],
+        maximos=["datafaturamento"],
+    )
+    # Cursor nomeado: mesmos parâmetros, no formato do psycopg2
+    sql, params = _consulta(QUERY_EXTRATO, filtros).sql_psycopg()
+    # A leitura acontece dentro da gravação; as etapas de leitura são descontadas da exportação
+    with etapa("exportacao"):
+        exportar_csv(_somando(ler_em_blocos(connect, sql, params), agregador), nome_arquivo)
+    print(f"✅ Extrato exportado: {nome_arquivo} ({agregador.linhas:,} linhas)")
+
+    df_resumo = agregador.resultado().rename(columns={
+        "qtd_datafaturamento": "qtd_pedidos",
+        "quantidadenegociada": "qtd_itens_total",
+        "datafaturamento": "ultima_venda",
+    })
+    produtos = ler_consulta(connect, _consulta(QUERY_PRODUTOS_POR_CLIENTE, filtros))
+    df_resumo = df_resumo.merge(produtos, on="codigocliente", how="left")
+    df_resumo["itens_por_pedidos"] = np.ceil(
+        df_resumo["qtd_itens_total"] / df_resumo["qtd_pedidos"].replace(0, np.nan)
+    )
+    return df_resumo.sort_values("faturamento", ascending=False, ignore_index=True)
+
+
+def resumir(df_resumo, filtros):
+    print("📊 Extrato de vendas processado!")
+    print(f"Filtros: {filtros.descricao()}")
+    print(f"Total de clientes: {len(df_resumo)}")
+    print(f"Total de pedidos: {df_resumo['qtd_pedidos'].sum():,}")
+    print(f"Faturamento total: R$ {df_resumo['faturamento'].sum():,.2f}")
+
+    print("\n📋 Top Clientes:")
+    print(df_resumo.head(10))
+
+
+registrar(Relatorio(
+    nome="extratovendas",
+    gerar=gerar,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="Extrato_Vendas_Resumo_",
+    padrao=False,
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["extratovendas", *sys.argv[1:]])
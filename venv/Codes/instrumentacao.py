@@ -0,0 +1,213 @@
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Tempo e memória de cada relatório, por etapa:
+#   conexao                  obter a conexão do pool
+#   execucao_e_transferencia cursor comum: o execute só volta com o resultado inteiro
+#                            no cliente, então servidor e rede não se separam
+#   execucao                 cursor nomeado: DECLARE e o primeiro FETCH (até o primeiro lote)
+#   transferencia            cursor nomeado: os FETCH seguintes
+#   conversao                linhas do psycopg2 viram DataFrame
+#   cache                    ler o cache local em Parquet (modo offline)
+#   pandas                   o restante do gerar(): merges, groupby, curva ABC...
+#   exportacao               gravar o arquivo
+#   explain                  EXPLAIN ANALYZE repetido pelo --explain; fica fora do tempo total
+# O tempo só do servidor está no plano do --explain (execucao_servidor_ms).
+# As funções de banco e de cache chamam etapa() sem saber quem está medindo; a
+# medição ativa fica em uma variável da thread que roda o relatório.
+# Etapas aninhadas não contam duas vezes: a de fora só fica com o tempo próprio.
+
+_atual = threading.local()
+
+MB = 1024 * 1024
+
+
+class Medicao:
+    def __init__(self, relatorio, filtros=None, memoria=False, explain=False):
+        self.relatorio = relatorio
+        self.filtros = filtros
+        self.memoria = memoria
+        self.explain = explain
+        self.inicio = None
+        self.total = 0.0
+        self.etapas = {}
+        self.picos = {}
+        self.planos = []
+        self.rss_pico = None
+        self.linhas = None
+        self.erro = None
+        self._pilha = []
+
+    def _entrar(self):
+        quadro = {"filhos": 0.0, "base": 0, "pico": 0}
+        if self.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            # O pico é global: antes de zerar, guarda o que já valia para as etapas abertas
+            for aberto in self._pilha:
+                aberto["pico"] = max(aberto["pico"], pico - aberto["base"])
+            tracemalloc.reset_peak()
+            quadro["base"] = atual
+        self._pilha.append(quadro)
+        return quadro, time.perf_counter()
+
+    def _sair(self, quadro, inicio):
+        decorrido = time.perf_counter() - inicio
+        if self.memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            for aberto in self._pilha:
+                aberto["pico"] = max(aberto["pico"], pico - aberto["base"])
+        self._pilha.pop()
+        if self._pilha:
+            self._pilha[-1]["filhos"] += decorrido
+        return decorrido, decorrido - quadro["filhos"]
+
+    def _somar(self, nome, proprio, pico):
+        self.etapas[nome] = self.etapas.get(nome, 0.0) + proprio
+        if self.memoria:
+            self.picos[nome] = max(self.picos.get(nome, 0), pico)
+
+    @contextmanager
+    def medir(self, nome):
+        quadro, inicio = self._entrar()
+        try:
+            yield
+        finally:
+            _, proprio = self._sair(quadro, inicio)
+            self._somar(nome, proprio, quadro["pico"])
+
+    @contextmanager
+    def ativa(self):
+        """Mede o gerar() de um relatório; o tempo não atribuído a nenhuma etapa vira "pandas"."""
+        anterior = getattr(_atual, "medicao", None)
+        _atual.medicao = self
+        self.inicio = self.inicio or datetime.now()
+        explain_antes = self.etapas.get("explain", 0.0)
+        quadro, inicio = self._entrar()
+        try:
+            yield self
+        finally:
+            decorrido, proprio = self._sair(quadro, inicio)
+            self.total += decorrido - (self.etapas.get("explain", 0.0) - explain_antes)
+            self._somar("pandas", proprio, quadro["pico"])
+            if self.memoria:
+                self.picos["total"] = max(self.picos.get("total", 0), quadro["pico"])
+                self.rss_pico = rss_pico_processo()
+            _atual.medicao = anterior
+
+    def resumo(self):
+        etapas = ", ".join(f"{nome} {segundos:.2f}s" for nome, segundos in self.etapas.items())
+        if self.memoria and "total" in self.picos:
+            etapas += f" | pico {self.picos['total'] / MB:,.1f} MB"
+        return etapas
+
+    def registro(self):
+        return {
+            "relatorio": self.relatorio,
+            "filtros": vars(self.filtros) if self.filtros is not None else None,
+            "inicio": self.inicio.isoformat(timespec="seconds") if self.inicio else None,
+            "erro": self.erro,
+            "linhas": self.linhas,
+            "tempo_total_s": round(self.total, 4),
+            "etapas_s": {nome: round(segundos, 4) for nome, segundos in self.etapas.items()},
+            "pico_memoria_mb": (
+                {nome: round(pico / MB, 2) for nome, pico in self.picos.items()}
+                if self.memoria else None
+            ),
+            "rss_pico_processo_mb": round(self.rss_pico / MB, 1) if self.rss_pico is not None else None,
+            "planos": self.planos,
+        }
+
+
+def medicao_atual():
+    return getattr(_atual, "medicao", None)
+
+
+@contextmanager
+def etapa(nome):
+    medicao = medicao_atual()
+    if medicao is None:
+        yield
+    else:
+        with medicao.medir(nome):
+            yield
+
+
+def capturar_plano(cursor, sql, params=None, consulta=None):
+    """Se a medição ativa pedir, roda EXPLAIN (ANALYZE, BUFFERS) do mesmo SQL e guarda o plano.
+
+    O ANALYZE executa a consulta de novo; o tempo vai para a etapa "explain",
+    que não entra no tempo total nem nas outras etapas.
+    """
+    medicao = medicao_atual()
+    if medicao is None or not medicao.explain:
+        return
+    with medicao.medir("explain"):
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    medicao.planos.append({
+        "consulta": consulta,
+        "planejamento_ms": plano[0].get("Planning Time"),
+        "execucao_servidor_ms": plano[0].get("Execution Time"),
+        "plano": plano[0]["Plan"],
+    })
+
+
+def rss_pico_processo():
+    """Pico de memória residente do processo, em bytes, ou None se não houver como medir.
+
+    Cobre o que o tracemalloc não vê (buffers do pyarrow e da libpq), mas é do
+    processo inteiro: não separa relatórios paralelos e nunca diminui.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: só com o psutil instalado
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+@contextmanager
+def rastrear_memoria(ativo=True):
+    # tracemalloc enxerga as alocações do Python e do numpy/pandas, mas deixa tudo mais lento.
+    # Não vê o que o pyarrow e a libpq alocam por fora; para isso fica o rss_pico_processo().
+    if not ativo or tracemalloc.is_tracing():
+        yield
+        return
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def gravar_registros(caminho, medicoes, **contexto):
+    """Acrescenta uma linha JSON por relatório em `caminho` (JSON Lines) e devolve os registros."""
+    contexto = {
+        "execucao": uuid.uuid4().hex[:12],
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "maquina": platform.node(),
+        **contexto,
+    }
+    registros = [{**contexto, **medicao.registro()} for medicao in medicoes]
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        for registro in registros:
+            arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    return registros
@@ -0,0 +1,85 @@
+import os
+import uuid
+
+import pandas as pd
+
+from instrumentacao import capturar_plano, etapa
+
+# Quantidade de linhas buscadas do servidor por vez no modo streaming
+TAMANHO_LOTE = int(os.getenv("STREAM_TAMANHO_LOTE", "50000"))
+
+
+def ler_em_blocos(connect, query, params=None, tamanho_lote=None, consulta="ler_em_blocos"):
+    """Executa `query` em um cursor nomeado (server-side) e devolve DataFrames de até `tamanho_lote` linhas.
+
+    Só um bloco fica em memória por vez; o restante do resultado permanece no servidor.
+    Um resultado vazio rende um único bloco sem linhas, com as colunas da consulta.
+    `consulta` identifica o plano no registro do EXPLAIN.
+    """
+    tamanho_lote = tamanho_lote or TAMANHO_LOTE
+    with connect.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+        cursor.itersize = tamanho_lote
+        # O DECLARE só abre o cursor; o servidor executa a consulta no primeiro FETCH
+        with etapa("execucao"):
+            cursor.execute(query, params)
+            linhas = cursor.fetchmany(tamanho_lote)
+        colunas = [descricao[0] for descricao in cursor.description]
+        while True:
+            with etapa("conversao"):
+                # NUMERIC chega como Decimal; em float o groupby do agregador fica vetorizado
+                bloco = pd.DataFrame.from_records(linhas, columns=colunas, coerce_float=True)
+            yield bloco
+            with etapa("transferencia"):
+                linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+
+    with connect.cursor() as cursor:
+        capturar_plano(cursor, query, params, consulta=consulta)
+
+
+class AgregadorIncremental:
+    """Agrega blocos um a um, guardando apenas um resultado parcial por chave.
+
+    Somas e contagens são somadas entre blocos e máximos comparados, então a
+    memória depende do número de chaves, não do de linhas. Contagens
+    distintas não entram: exigiriam guardar todos os pares (chave, valor);
+    essas ficam para um GROUP BY no servidor.
+    """
+
+    def __init__(self, chaves, somas=(), contagens=(), maximos=()):
+        self.chaves = list(chaves)
+        self.somas = list(somas)
+        self.contagens = list(contagens)
+        self.maximos = list(maximos)
+        self._parcial = None
+        self.linhas = 0
+
+    def _agregar(self, df, combinando):
+        agregacoes = {coluna: "sum" for coluna in self.somas}
+        # Na primeira passada conta linhas; ao combinar parciais soma as contagens
+        agregacoes.update({
+            f"qtd_{coluna}": ("sum" if combinando else "count") for coluna in self.contagens
+        })
+        agregacoes.update({coluna: "max" for coluna in self.maximos})
+        if not combinando:
+            df = df.assign(**{f"qtd_{coluna}": df[coluna] for coluna in self.contagens})
+        return df.groupby(self.chaves, dropna=False).agg(agregacoes)
+
+    def adicionar(self, bloco):
+        self.linhas += len(bloco)
+        parcial = self._agregar(bloco, combinando=False)
+        if self._parcial is not None:
+            parcial = self._agregar(
+                pd.concat([self._parcial, parcial]).reset_index(), combinando=True
+            )
+        self._parcial = parcial
+
+    def resultado(self):
+        colunas = (
+            self.chaves + self.somas + [f"qtd_{coluna}" for coluna in self.contagens] + self.maximos
+        )
+        if self._parcial is None:
+            # Nenhuma linha no período: mesmas colunas, para o relatório não depender de dados
+            return pd.DataFrame(columns=colunas)
+        return self._parcial.reset_index()[colunas]
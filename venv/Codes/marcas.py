@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+import cache_fatos
+from instrumentacao import etapa
+
+# Dimensão de marcas normalizada: codigoproduto -> marca canônica.
+# A marca canônica é o nome em maiúsculas, sem espaços nas pontas, a não ser
+# que alguma regra de apelido diga outra coisa. As regras usam padrões do LIKE
+# (% e _) sem diferenciar maiúsculas; a primeira que casar vence.
+REGRAS_PADRAO = {
+    "HYDRONORTH": ["%HYDRONORTH%"],
+}
+
+# Regras próprias podem ficar em um JSON {"MARCA": ["%PADRAO%", ...]}
+ARQUIVO_REGRAS = os.getenv("MARCAS_REGRAS", os.path.join(os.path.dirname(__file__), "marcas.json"))
+
+# Por quanto tempo a dimensão baixada do banco é reaproveitada
+VALIDADE_HORAS = float(os.getenv("MARCAS_VALIDADE_HORAS", "24"))
+
+QUERY_PRODUTOS = """
+    SELECT codigoproduto, marca
+    FROM dbo.bi_produto
+"""
+
+
+def carregar_regras():
+    if os.path.exists(ARQUIVO_REGRAS):
+        with open(ARQUIVO_REGRAS, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    return REGRAS_PADRAO
+
+
+def _regex_do_like(padrao):
+    partes = (".*" if c == "%" else "." if c == "_" else re.escape(c) for c in padrao.upper())
+    return re.compile("".join(partes), re.DOTALL)
+
+
+def normalizar(produtos, regras=None):
+    """Devolve codigoproduto, marca e marca_canonica a partir de bi_produto."""
+    regras = carregar_regras() if regras is None else regras
+    compiladas = [
+        (canonica.upper(), _regex_do_like(padrao))
+        for canonica, padroes in regras.items()
+        for padrao in padroes
+    ]
+
+    # As regras rodam uma vez por nome de marca distinto, não por produto
+    nomes = pd.Series(produtos["marca"].dropna().unique())
+    canonicas = nomes.str.strip().str.upper()
+    for i, nome in canonicas.items():
+        for canonica, regex in compiladas:
+            if regex.fullmatch(nome):
+                canonicas[i] = canonica
+                break
+
+    dimensao = produtos[["codigoproduto", "marca"]].copy()
+    dimensao["marca_canonica"] = dimensao["marca"].map(dict(zip(nomes, canonicas)))
+    return dimensao
+
+
+def _caminho_cache():
+    return cache_fatos.PASTA_CACHE / "dimensoes" / "marcas.parquet"
+
+
+def dimensao_marcas(connect=None, produtos=None):
+    """Dimensão de marcas normalizada.
+
+    Com conexão, reaproveita o arquivo do cache enquanto estiver dentro da
+    validade, as regras não tiverem mudado e todos os `produtos` (códigos que
+    o relatório vai cruzar) estiverem nele; senão baixa bi_produto de novo.
+    Sem conexão, normaliza a cópia de bi_produto do cache de fatos.
+    """
+    regras = carregar_regras()
+    if connect is None:
+        return normalizar(cache_fatos.ler_dimensao("bi_produto"), regras)
+
+    caminho = _caminho_cache()
+    estado = caminho.with_name("marcas_estado.json")
+    if caminho.exists() and estado.exists():
+        salvo = json.loads(estado.read_text(encoding="utf-8"))
+        if salvo["regras"] == regras and time.time() - salvo["baixado_em"] < VALIDADE_HORAS * 3600:
+            with etapa("cache"):
+                dimensao = pd.read_parquet(caminho)
+            # Produto cadastrado depois do download: sem isso a venda sumiria no merge
+            if produtos is None or pd.Series(produtos).dropna().isin(dimensao["codigoproduto"]).all():
+                return dimensao
+
+    with connect.cursor() as cursor:
+        with etapa("execucao_e_transferencia"):
+            cursor.execute(QUERY_PRODUTOS)
+        with etapa("conversao"):
+            produtos = pd.DataFrame.from_records(cursor.fetchall(), columns=["codigoproduto", "marca"])
+    dimensao = normalizar(produtos, regras)
+
+    # Grava em arquivo temporário e troca de uma vez: outro relatório pode estar lendo
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(f"{caminho.stem}_{os.getpid()}.tmp")
+    dimensao.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+    estado.write_text(json.dumps({"regras": regras, "baixado_em": time.time()}), encoding="utf-8")
+    return dimensao
+
+
+def canonicas_de(dimensao, marcas):
+    """Marcas canônicas que correspondem aos nomes exatos em `marcas` (vazio = todas)."""
+    if marcas:
+        dimensao = dimensao[dimensao["marca"].isin(marcas)]
+    return sorted(dimensao["marca_canonica"].dropna().unique())
+
+
+def nome_coluna(marca):
+    return "faturamento_" + re.sub(r"\W+", "_", marca.lower()).strip("_")
+
+
+def pivotar(vendas, dimensao, marcas, linha, valor="faturamento"):
+    """Matriz `linha` × marca com o total de `valor`, mais a coluna faturamento_total.
+
+    `vendas` vem em formato longo (uma linha por `linha` e codigoproduto).
+    Vendas de marcas fora de `marcas` e de produtos fora da dimensão são
+    descartadas, como no INNER JOIN com bi_produto filtrado por marca.
+    """
+    df = vendas.merge(dimensao[["codigoproduto", "marca_canonica"]], on="codigoproduto", how="inner")
+    # Posição da marca na lista de colunas; -1 para marcas que não foram pedidas
+    codigos_marca = pd.Index(marcas).get_indexer(df["marca_canonica"])
+    df, codigos_marca = df[codigos_marca >= 0], codigos_marca[codigos_marca >= 0]
+    # Linha nula (ex.: vendedor sem nome) vira um rótulo próprio em vez de código -1
+    codigos_linha, rotulos = pd.factorize(df[linha], sort=True, use_na_sentinel=False)
+
+    # Uma única passada de bincount, independente de quantas marcas viram coluna
+    matriz = np.bincount(
+        codigos_linha * len(marcas) + codigos_marca,
+        weights=df[valor].to_numpy(dtype=float),
+        minlength=len(rotulos) * len(marcas),
+    ).reshape(len(rotulos), len(marcas))
+
+    resultado = pd.DataFrame(matriz, columns=[nome_coluna(marca) for marca in marcas])
+    resultado.insert(0, linha, rotulos)
+    resultado["faturamento_total"] = matriz.sum(axis=1)
+    return resultado.sort_values("faturamento_total", ascending=False, ignore_index=True)
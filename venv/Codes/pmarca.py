@@ -0,0 +1,95 @@
+import pandas as pd
+
+import cache_fatos
+from consultas import Consulta, Filtros, filtrar_offline, ler_consulta, mes
+from marcas import canonicas_de, dimensao_marcas, pivotar
+from registro import Relatorio, registrar
+
+# Só agrega vendedor × produto; a divisão por marca é feita no pandas com a
+# dimensão de marcas (marcas.py), então o custo não cresce com o número de marcas
+QUERY = """
+    SELECT
+        bf.codigovendedor,
+        bf.codigoproduto,
+        SUM(bf.precounitario * bf.quantidadenegociada) AS faturamento
+    FROM
+        dbo.bi_fato AS bf
+    WHERE
+        bf.tipomovumento IN ('V', 'B'){filtros}
+    GROUP BY
+        bf.codigovendedor,
+        bf.codigoproduto;
+    """
+
+QUERY_VENDEDORES = """
+    SELECT codigovendedor, nomerepresentante
+    FROM dbo.bi_vendedor
+    """
+
+
+def filtros_padrao():
+    # Mês corrente; as marcas escolhem as colunas do relatório (--marca troca a lista)
+    inicio, fim = mes(pd.Timestamp.today().strftime("%Y-%m"))
+    return Filtros(inicio=inicio, fim=fim, marcas=("MECTRONIC", "FORTLEV", "HYDRONORTH"))
+
+
+def montar(vendas, vendedores, dimensao, filtros):
+    vendas = vendas.merge(vendedores, on="codigovendedor", how="inner")
+    return pivotar(vendas, dimensao, canonicas_de(dimensao, filtros.marcas), linha="nomerepresentante")
+
+
+def gerar(connect, filtros):
+    # Marcas filtram por semi-join em bi_produto; o nome canônico vem da dimensão local
+    consulta = Consulta(QUERY).aplicar(
+        filtros,
+        coluna_data="bf.datafaturamento",
+        coluna_cliente="bf.codigocliente",
+        coluna_produto="bf.codigoproduto",
+    )
+    # Executar a query e criar DataFrame
+    vendas = ler_consulta(connect, consulta)
+    vendedores = ler_consulta(connect, Consulta(QUERY_VENDEDORES))
+    dimensao = dimensao_marcas(connect, produtos=vendas["codigoproduto"].unique())
+    return montar(vendas, vendedores, dimensao, filtros)
+
+
+def gerar_offline(filtros):
+    fatos = cache_fatos.ler_fatos("bi_fato", inicio=filtros.inicio, fim=filtros.fim)
+    fatos = filtrar_offline(fatos, filtros)
+    fatos = fatos.assign(faturamento=fatos["precounitario"] * fatos["quantidadenegociada"])
+    vendas = fatos.groupby(["codigovendedor", "codigoproduto"], as_index=False)["faturamento"].sum()
+    return montar(vendas, cache_fatos.ler_dimensao("bi_vendedor"), dimensao_marcas(), filtros)
+
+
+def resumir(df_vendas, filtros):
+    # Verificar os dados
+    print("📊 Dados de vendas carregados!")
+    print(f"Filtros: {filtros.descricao()}")
+    print(f"Total de vendedores: {len(df_vendas)}")
+    print("\n📋 Resultados consolidados por representante:")
+    print(df_vendas.head(10))
+
+    # Estatísticas resumidas
+    print(f"\n🎯 Estatísticas Gerais:")
+    for coluna in df_vendas.columns:
+        if coluna.startswith("faturamento_") and coluna != "faturamento_total":
+            marca = coluna.removeprefix("faturamento_").upper()
+            print(f"Total {marca}: R$ {df_vendas[coluna].sum():,.2f}")
+    print(f"💰 Faturamento Total Geral: R$ {df_vendas['faturamento_total'].sum():,.2f}")
+
+
+registrar(Relatorio(
+    nome="pmarca",
+    gerar=gerar,
+    gerar_offline=gerar_offline,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="Vendas_Representantes_7dias_",
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["pmarca", *sys.argv[1:]])
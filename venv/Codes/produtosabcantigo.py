@@ -0,0 +1,128 @@
+import cache_fatos
+from agregacoes import agregar_produtos
+from consultas import Consulta, Filtros, filtrar_offline, ler_consulta, mes
+from curva_abc import classificar
+from registro import Relatorio, registrar
+
+QUERY_VENDAS = """
+    WITH vendas AS (
+        SELECT
+            bfa.codigoproduto,
+            bp.nomeproduto,
+            bp.marca,
+            SUM(bfa.precounitario * bfa.quantidadenegociada) AS faturamento,
+            SUM(bfa.quantidadenegociada) AS Qtd_Itens,
+            COUNT(bfa.datafaturamento) AS Qtd_Pedidos,
+            CEILING(SUM(bfa.quantidadenegociada) / COUNT(bfa.datafaturamento)) AS Itens_por_Pedidos,
+            MAX(bfa.datafaturamento) AS ultima_venda,
+            pb.permitecompra,
+            pb.permitevenda,
+            pb.inativo
+        FROM
+            dbo.bi_fato_antigo AS bfa
+        INNER JOIN
+            dbo.bi_produto AS bp ON bfa.codigoproduto = bp.codigoproduto
+        INNER JOIN
+            dbo.produtobase AS pb ON bfa.codigoproduto = pb.codigoprincipal
+        WHERE
+            bfa.tipomovumento IN ('V', 'B'){filtros}
+        GROUP BY
+            bfa.codigoproduto, bp.nomeproduto, bp.marca, 
+            pb.permitecompra, pb.permitevenda, pb.inativo, pb.codigoprincipal
+    ),
+    -- Último estoque de cada produto vendido, em uma única passada por bi_estoque
+    -- (ORDER BY data DESC igual ao antigo LIMIT 1; MAX(data) igual ao antigo data_estoque)
+    ultimo_estoque AS (
+        SELECT DISTINCT ON (be.codigoprincipal)
+            be.codigoprincipal,
+            be.estoquenadata AS estoque_na_data,
+            MAX(be.data) OVER (PARTITION BY be.codigoprincipal) AS data_estoque
+        FROM
+            dbo.bi_estoque be
+        WHERE
+            be.codigoprincipal IN (SELECT codigoproduto FROM vendas)
+        ORDER BY
+            be.codigoprincipal, be.data DESC
+    )
+    SELECT
+        v.codigoproduto,
+        v.nomeproduto,
+        v.marca,
+        v.faturamento,
+        v.Qtd_Itens,
+        v.Qtd_Pedidos,
+        v.Itens_por_Pedidos,
+        v.ultima_venda,
+        ue.estoque_na_data,
+        ue.data_estoque,
+        CASE WHEN v.permitecompra = TRUE THEN '[✓]' ELSE '[ ]' END AS P_Compra,
+        CASE WHEN v.permitevenda = TRUE THEN '[✓]' ELSE '[ ]' END AS P_Venda, 
+        CASE WHEN v.inativo = TRUE THEN '[✓]' ELSE '[ ]' END AS Inativo
+    FROM
+        vendas v
+    LEFT JOIN
+        ultimo_estoque ue ON ue.codigoprincipal = v.codigoproduto
+    ORDER BY
+        faturamento DESC;
+"""
+
+
+def filtros_padrao():
+    # Setembro de 2024
+    inicio, fim = mes("2024-09")
+    return Filtros(inicio=inicio, fim=fim)
+
+
+def gerar(connect, filtros):
+    consulta = Consulta(QUERY_VENDAS).aplicar(
+        filtros,
+        coluna_data="bfa.datafaturamento",
+        coluna_cliente="bfa.codigocliente",
+        coluna_marca="bp.marca",
+    )
+    # Executar a query
+    df_produto = ler_consulta(connect, consulta)
+    return classificar(df_produto)
+
+
+def gerar_offline(filtros):
+    fatos = cache_fatos.ler_fatos("bi_fato_antigo", inicio=filtros.inicio, fim=filtros.fim)
+    fatos = filtrar_offline(fatos, filtros)
+    df_produto = agregar_produtos(
+        fatos,
+        cache_fatos.ler_dimensao("bi_produto"),
+        cache_fatos.ler_dimensao("produtobase"),
+        cache_fatos.ler_ultimo_estoque(),
+    )
+    return classificar(df_produto)
+
+
+def resumir(df_produto, filtros):
+    # 3. Verificar os dados
+    print("📊 Dados de vendas carregados!")
+    print(f"Filtros: {filtros.descricao()}")
+    print(f"Total de produtos: {len(df_produto)}")
+    print("\nPrimeiras linhas COM CLASSIFICAÇÃO ABC:")
+    print(df_produto.head(10))
+
+    # ✅ MOSTRAR DISTRIBUIÇÃO ABC
+    print(f"\n🎯 Distribuição ABC:")
+    print(df_produto['Classificacao'].value_counts())
+    print(f"📊 Total de clientes analisados: {len(df_produto)}")
+
+
+registrar(Relatorio(
+    nome="produtosabcantigo",
+    gerar=gerar,
+    gerar_offline=gerar_offline,
+    filtros_padrao=filtros_padrao,
+    resumir=resumir,
+    prefixo_arquivo="fato_antigo",
+))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from executar_relatorios import main
+    main(["produtosabcantigo", *sys.argv[1:]])
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from consultas import Filtros
+
+
+@dataclass(frozen=True)
+class Relatorio:
+    nome: str
+    # Recebe uma conexão aberta e os filtros e devolve o DataFrame final do relatório
+    gerar: Callable[..., pd.DataFrame]
+    # Imprime o resumo do relatório no console
+    resumir: Callable[[pd.DataFrame, Filtros], None]
+    prefixo_arquivo: str
+    # Versão sem banco: lê o cache local de fatos (cache_fatos.py)
+    gerar_offline: Callable[[Filtros], pd.DataFrame] | None = None
+    # Período/UF/marcas usados quando a linha de comando não informa outros
+    filtros_padrao: Callable[[], Filtros] = Filtros
+    # Relatórios pesados (ex.: extratos linha a linha) só rodam quando pedidos pelo nome
+    padrao: bool = True
+
+
+RELATORIOS: dict[str, Relatorio] = {}
+
+
+def registrar(relatorio):
+    existente = RELATORIOS.get(relatorio.nome)
+    # Um script executado direto (__main__) é importado de novo pelo executor com o nome do módulo
+    modulos = {relatorio.gerar.__module__, existente.gerar.__module__} if existente else set()
+    if existente and "__main__" not in modulos:
+        raise ValueError(f"Relatório já registrado: {relatorio.nome}")
+    RELATORIOS[relatorio.nome] = relatorio
+    return relatorio
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+import cache_fatos
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_fatos, "PASTA_CACHE", tmp_path)
+    pasta = tmp_path / "bi_fato"
+    pasta.mkdir()
+    cache_fatos._gravar_estado("bi_fato", {"watermark": "2025-02-28T00:00:00"})
+    cheio = pd.DataFrame({
+        "codigocliente": [1, 2],
+        "codigoproduto": [10, 20],
+        "codigovendedor": [5, 5],
+        "tipomovumento": ["V", "B"],
+        "datafaturamento": pd.to_datetime(["2025-01-10", "2025-01-20"]),
+        "precounitario": [1.5, 2.0],
+        "quantidadenegociada": [3.0, 4.0],
+    })
+    # Mês sem vendas, como o read_sql devolve: colunas sem tipo
+    vazio = pd.DataFrame(columns=list(cache_fatos.COLUNAS_FATO))
+    cache_fatos._tipar(cheio).to_parquet(pasta / "2025-01.parquet", index=False)
+    vazio.to_parquet(pasta / "2025-02.parquet", index=False)
+    return pasta
+
+
+def test_mes_vazio_nao_estraga_os_tipos(cache):
+    fatos = cache_fatos.ler_fatos("bi_fato", inicio="2025-01-01", fim="2025-03-01")
+    assert len(fatos) == 2
+    assert fatos["precounitario"].dtype == "float64"
+    assert fatos["codigocliente"].dtype == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(fatos["datafaturamento"])
+
+
+def test_periodo_sem_arquivo_devolve_colunas_tipadas(cache):
+    fatos = cache_fatos.ler_fatos("bi_fato", inicio="2024-09-01", fim="2024-10-01")
+    assert fatos.empty
+    assert list(fatos.columns) == list(cache_fatos.COLUNAS_FATO)
+    assert pd.api.types.is_datetime64_any_dtype(fatos["datafaturamento"])
+    assert fatos["datafaturamento"].dt.to_period("M").empty
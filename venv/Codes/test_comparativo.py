@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comparativo import Periodo, comparar, migracao
+
+
+def test_migracao():
+    anterior = pd.Series(["A", np.nan, "B", np.nan], dtype=object)
+    atual = pd.Series(["B", "C", np.nan, np.nan], dtype=object)
+    resultado = migracao(anterior, atual)
+    assert resultado[:3].tolist() == ["A→B", "novo", "perdido"]
+    assert pd.isna(resultado[3])
+
+
+def test_comparar_tres_periodos():
+    periodos = [Periodo.de_texto(mes) for mes in ("2025-01", "2025-02", "2025-03")]
+    # X está nos três meses; Y some em fevereiro e volta; Z só aparece em janeiro
+    df_longo = pd.DataFrame({
+        "periodo": ["2025-01", "2025-02", "2025-03", "2025-01", "2025-03", "2025-01"],
+        "grupo_ou_cliente": ["X", "X", "X", "Y", "Y", "Z"],
+        "faturamento": [50.0, 100.0, 60.0, 40.0, 40.0, 10.0],
+    })
+    resultado = comparar(df_longo, periodos, "clientes").set_index("grupo_ou_cliente")
+
+    assert resultado.index.tolist() == ["X", "Y", "Z"]
+    assert resultado["classe_2025-01"].tolist() == ["A", "B", "C"]
+    assert resultado.loc[["X", "Y"], "classe_2025-03"].tolist() == ["A", "C"]
+    assert pd.isna(resultado.loc["Z", "classe_2025-03"])
+    assert resultado.loc["X", "crescimento_2025-01_2025-02"] == pytest.approx(100)
+    assert resultado.loc["Y", "crescimento_2025-01_2025-02"] == pytest.approx(-100)
+    assert pd.isna(resultado.loc["Y", "crescimento_2025-02_2025-03"])
+
+    # Sozinho em fevereiro, X tem 100% acumulado e cai para C
+    assert resultado["migracao_2025-01_2025-02"].tolist() == ["A→C", "perdido", "perdido"]
+    assert resultado.loc["Y", "migracao_2025-02_2025-03"] == "novo"
+    assert pd.isna(resultado.loc["Z", "migracao_2025-02_2025-03"])
@@ -0,0 +1,55 @@
+import argparse
+
+import pandas as pd
+import pytest
+
+from consultas import Consulta, Filtros, adicionar_argumentos, conferir_argumentos
+
+
+def test_sql_psycopg_troca_marcadores_na_ordem_do_texto():
+    consulta = Consulta("SELECT $2 AS b, $1 AS a, $2 AS b2 WHERE x LIKE '%A%'{filtros}")
+    consulta.params = ["primeiro", "segundo"]
+    sql, params = consulta.sql_psycopg()
+    assert sql == "SELECT %s AS b, %s AS a, %s AS b2 WHERE x LIKE '%%A%%'"
+    assert params == ["segundo", "primeiro", "segundo"]
+
+
+def test_sql_psycopg_com_filtros():
+    filtros = Filtros(
+        inicio=pd.Timestamp("2025-01-01"),
+        fim=pd.Timestamp("2025-02-01"),
+        ufs=("RJ",),
+        marcas=("FORTLEV",),
+    )
+    consulta = Consulta("SELECT * FROM dbo.bi_fato AS bf WHERE bf.tipomovumento = 'V'{filtros}").aplicar(
+        filtros, coluna_data="bf.datafaturamento", coluna_cliente="bf.codigocliente", coluna_marca="bp.marca"
+    )
+    sql, params = consulta.sql_psycopg()
+    assert "bf.datafaturamento >= %s" in sql
+    assert "bf.datafaturamento < %s" in sql
+    assert "bf.codigocliente IN (SELECT codigocliente FROM dbo.bi_cliente WHERE uf = ANY(%s))" in sql
+    assert "bp.marca = ANY(%s)" in sql
+    assert "$" not in sql
+    assert params == [
+        pd.Timestamp("2025-01-01").to_pydatetime(),
+        pd.Timestamp("2025-02-01").to_pydatetime(),
+        ["RJ"],
+        ["FORTLEV"],
+    ]
+
+
+def test_sem_filtros_nao_acrescenta_condicoes():
+    consulta = Consulta("SELECT 1 WHERE TRUE{filtros}").aplicar(Filtros(), coluna_data=None)
+    assert consulta.sql_psycopg() == ("SELECT 1 WHERE TRUE", [])
+
+
+def test_periodo_aceita_uma_forma_so():
+    parser = argparse.ArgumentParser()
+    adicionar_argumentos(parser)
+    args = parser.parse_args(["--inicio", "2025-01-01", "--fim", "2025-02-01"])
+    conferir_argumentos(parser, args)
+    for argv in (["--mes", "2025-01", "--ultimos-meses", "2"], ["--mes", "2025-01", "--inicio", "2025-01-01"]):
+        with pytest.raises(SystemExit):
+            parser.parse_args(argv)
+    with pytest.raises(SystemExit):
+        conferir_argumentos(parser, parser.parse_args(["--ultimos-meses", "2", "--fim", "2025-02-01"]))
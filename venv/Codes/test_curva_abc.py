@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from curva_abc import agregar_e_classificar, classificar, ler_limites
+
+
+def test_limite_exato_fica_na_classe_de_baixo():
+    df = pd.DataFrame({"cliente": list("abcd"), "faturamento": [80.0, 15.0, 4.0, 1.0]})
+    resultado = classificar(df)
+    assert resultado["cliente"].tolist() == list("abcd")
+    assert resultado["PorcentAcumulado"].tolist() == pytest.approx([80, 95, 99, 100])
+    assert resultado["Classificacao"].tolist() == ["A", "B", "C", "C"]
+
+
+def test_curvas_independentes_por_grupo():
+    df = pd.DataFrame({
+        "uf": ["RJ", "RJ", "SP", "SP"],
+        "cliente": list("abcd"),
+        "faturamento": [10.0, 90.0, 60.0, 40.0],
+    })
+    resultado = classificar(df, por=["uf"])
+    assert resultado["cliente"].tolist() == list("bacd")
+    assert resultado["PorcentAcumulado"].tolist() == pytest.approx([90, 100, 60, 100])
+    assert resultado["Classificacao"].tolist() == ["B", "C", "A", "C"]
+
+
+def test_aceita_decimal_do_psycopg2():
+    df = pd.DataFrame({"faturamento": [Decimal("30.5"), Decimal("69.5")]})
+    assert classificar(df)["Classificacao"].tolist() == ["A", "C"]
+
+
+def test_quatro_classes():
+    df = pd.DataFrame({"faturamento": [70.0, 20.0, 7.0, 3.0]})
+    resultado = classificar(df, limites=ler_limites("70,90,97"))
+    assert resultado["Classificacao"].tolist() == ["A", "B", "C", "D"]
+
+
+def test_limites_invalidos():
+    df = pd.DataFrame({"faturamento": [1.0]})
+    with pytest.raises(ValueError):
+        classificar(df, limites=(95, 80))
+    with pytest.raises(ValueError):
+        classificar(df, limites=(80, 95), classes=("A", "B"))
+
+
+def test_agregar_e_classificar_soma_antes_de_classificar():
+    vendas = pd.DataFrame({
+        "mes": ["01", "01", "01", "02"],
+        "cliente": ["a", "b", "a", "b"],
+        "faturamento": [40.0, 20.0, 40.0, 5.0],
+    })
+    resultado = agregar_e_classificar(vendas, "cliente", por=["mes"])
+    esperado = classificar(
+        pd.DataFrame({"mes": ["01", "01", "02"], "cliente": ["a", "b", "b"], "faturamento": [80.0, 20.0, 5.0]}),
+        por=["mes"],
+    )
+    pd.testing.assert_frame_equal(resultado.reset_index(drop=True), esperado.reset_index(drop=True))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import exportacao
+
+
+def test_linhas_trocam_nulos_por_none():
+    bloco = pd.DataFrame({
+        "codigo": pd.array([1, None], dtype="Int64"),
+        "valor": [1.5, np.nan],
+        "data": pd.to_datetime(["2025-01-02", None]),
+        "nome": ["A", None],
+    })
+    linhas = list(exportacao._linhas(bloco))
+    assert linhas[0] == (1, 1.5, pd.Timestamp("2025-01-02"), "A")
+    assert linhas[1] == (None, None, None, None)
+
+
+def test_xlsx_divide_em_abas(tmp_path, monkeypatch):
+    monkeypatch.setattr(exportacao, "MAX_LINHAS_XLSX", 4)
+    monkeypatch.setattr(exportacao, "TAMANHO_BLOCO_XLSX", 2)
+    df = pd.DataFrame({"n": range(7)})
+    caminho = tmp_path / "t.xlsx"
+    exportacao.exportar_xlsx({"aba": df, "vazia": df.iloc[:0]}, caminho)
+
+    workbook = load_workbook(caminho, read_only=True)
+    assert workbook.sheetnames == ["aba", "aba_2", "aba_3", "vazia"]
+    valores = [linha[0] for planilha in workbook.worksheets[:3] for linha in planilha.values]
+    assert valores == ["n", 0, 1, 2, "n", 3, 4, 5, "n", 6]
+    assert [linha for linha in workbook["vazia"].values] == [("n",)]
+
+
+def test_parquet_com_coluna_nula_no_primeiro_bloco(tmp_path):
+    blocos = [
+        pd.DataFrame({"codigo": [1, 2], "marca": [None, None]}),
+        pd.DataFrame({"codigo": [3], "marca": ["FORTLEV"]}),
+    ]
+    caminho = tmp_path / "t.parquet"
+    exportacao.exportar_parquet(iter(blocos), caminho)
+    lido = pd.read_parquet(caminho)
+    assert lido["codigo"].tolist() == [1, 2, 3]
+    assert lido["marca"].tolist()[2] == "FORTLEV"
+    assert lido["marca"].isna().tolist() == [True, True, False]
@@ -0,0 +1,94 @@
+import pandas as pd
+
+from consultas import Consulta, ler_consulta
+from instrumentacao import Medicao
+from leitura_streaming import AgregadorIncremental
+
+
+class _Cursor:
+    """Cursor em memória: devolve `linhas` em fetchmany (cursor nomeado) ou fetchall (comum)."""
+
+    def __init__(self, linhas):
+        self.linhas = list(linhas)
+        self.description = [("cliente",), ("valor",)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchmany(self, tamanho):
+        lote, self.linhas = self.linhas[:tamanho], self.linhas[tamanho:]
+        return lote
+
+    def fetchall(self):
+        return self.fetchmany(len(self.linhas))
+
+
+class _Conexao:
+    def __init__(self, linhas):
+        self.linhas = linhas
+
+    def cursor(self, name=None):
+        return _Cursor(self.linhas)
+
+
+def _agregador():
+    return AgregadorIncremental(
+        chaves=["cliente"],
+        somas=["valor"],
+        contagens=["data"],
+        maximos=["data"],
+    )
+
+
+def test_blocos_somados_como_um_groupby_so():
+    vendas = pd.DataFrame({
+        "cliente": ["a", "b", "a", "a", "b"],
+        "valor": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "data": pd.to_datetime(["2025-01-01", "2025-01-02", "2025-01-05", "2025-01-03", "2025-01-04"]),
+    })
+    agregador = _agregador()
+    for inicio in range(0, len(vendas), 2):
+        agregador.adicionar(vendas.iloc[inicio:inicio + 2])
+
+    resultado = agregador.resultado()
+    assert agregador.linhas == 5
+    assert resultado.columns.tolist() == ["cliente", "valor", "qtd_data", "data"]
+    assert resultado["valor"].tolist() == [8.0, 7.0]
+    assert resultado["qtd_data"].tolist() == [3, 2]
+    assert resultado["data"].tolist() == list(pd.to_datetime(["2025-01-05", "2025-01-04"]))
+
+
+def test_sem_blocos_devolve_todas_as_colunas():
+    resultado = _agregador().resultado()
+    assert resultado.empty
+    assert resultado.columns.tolist() == ["cliente", "valor", "qtd_data", "data"]
+
+
+def test_ler_consulta_em_blocos(monkeypatch):
+    monkeypatch.setattr("leitura_streaming.TAMANHO_LOTE", 2)
+    linhas = [("a", 1.0), ("b", 2.0), ("a", 3.0)]
+    df = ler_consulta(_Conexao(linhas), Consulta("SELECT 1"), streaming=True)
+    assert df.values.tolist() == [list(linha) for linha in linhas]
+
+    vazio = ler_consulta(_Conexao([]), Consulta("SELECT 1"), streaming=True)
+    assert vazio.empty
+    assert vazio.columns.tolist() == ["cliente", "valor"]
+
+
+def test_etapas_do_cursor_nomeado_e_do_comum(monkeypatch):
+    monkeypatch.setattr("leitura_streaming.TAMANHO_LOTE", 2)
+    linhas = [("a", 1.0), ("b", 2.0), ("a", 3.0)]
+    nomeado, comum = Medicao("nomeado"), Medicao("comum")
+    with nomeado.ativa():
+        ler_consulta(_Conexao(linhas), Consulta("SELECT 1"), streaming=True)
+    assert set(nomeado.etapas) == {"execucao", "transferencia", "conversao", "pandas"}
+
+    with comum.ativa():
+        ler_consulta(_Conexao(linhas), Consulta("SELECT 1"), streaming=False)
+    assert set(comum.etapas) == {"execucao_e_transferencia", "conversao", "pandas"}
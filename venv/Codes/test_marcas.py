@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+import cache_fatos
+from marcas import canonicas_de, dimensao_marcas, normalizar, pivotar
+
+REGRAS = {"HYDRONORTH": ["%HYDRONORTH%"], "MEC": ["mec_ronic"]}
+
+
+def test_normalizar():
+    produtos = pd.DataFrame({
+        "codigoproduto": [1, 2, 3, 4, 5, 6],
+        "marca": ["HYDRONORTH TUBOS", "hydronorth sa", " Fortlev ", "FORTLEV", "Mectronic", None],
+    })
+    dimensao = normalizar(produtos, REGRAS)
+    assert dimensao["marca"].tolist()[:5] == produtos["marca"].tolist()[:5]
+    assert dimensao["marca_canonica"].tolist()[:5] == ["HYDRONORTH", "HYDRONORTH", "FORTLEV", "FORTLEV", "MEC"]
+    assert pd.isna(dimensao.loc[5, "marca_canonica"])
+    assert canonicas_de(dimensao, ["hydronorth sa", "FORTLEV"]) == ["FORTLEV", "HYDRONORTH"]
+
+
+def test_pivotar():
+    dimensao = pd.DataFrame({
+        "codigoproduto": [1, 2, 3],
+        "marca_canonica": ["FORTLEV", "HYDRONORTH", "OUTRA"],
+    })
+    vendas = pd.DataFrame({
+        "nomerepresentante": ["ANA", "ANA", "BRUNO", None, "CARLA", "BRUNO"],
+        "codigoproduto": [1, 2, 2, 1, 3, 99],
+        "faturamento": [10.0, 5.0, 30.0, 7.0, 100.0, 50.0],
+    })
+    resultado = pivotar(vendas, dimensao, ["FORTLEV", "HYDRONORTH"], linha="nomerepresentante")
+
+    assert resultado.columns.tolist() == [
+        "nomerepresentante", "faturamento_fortlev", "faturamento_hydronorth", "faturamento_total",
+    ]
+    # CARLA só vendeu marca não pedida e o produto 99 não está na dimensão: ficam de fora
+    assert resultado["nomerepresentante"].tolist()[:2] == ["BRUNO", "ANA"]
+    assert pd.isna(resultado.loc[2, "nomerepresentante"])
+    assert resultado["faturamento_fortlev"].tolist() == pytest.approx([0, 10, 7])
+    assert resultado["faturamento_hydronorth"].tolist() == pytest.approx([30, 5, 0])
+    assert resultado["faturamento_total"].tolist() == pytest.approx([30, 15, 7])
+
+
+class _Conexao:
+    """Devolve `produtos` a qualquer consulta e conta quantas vezes foi usada."""
+
+    def __init__(self, produtos):
+        self.produtos = produtos
+        self.consultas = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+    def execute(self, sql, params=None):
+        self.consultas += 1
+
+    def fetchall(self):
+        return self.produtos
+
+
+def test_dimensao_baixa_de_novo_quando_falta_produto(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_fatos, "PASTA_CACHE", tmp_path)
+    conexao = _Conexao([(1, "FORTLEV"), (2, "Mectronic")])
+    dimensao_marcas(conexao)
+
+    # Dentro da validade e com todos os produtos no arquivo: não vai ao banco
+    conexao.produtos = [(1, "FORTLEV"), (2, "Mectronic"), (3, "hydronorth sa")]
+    assert len(dimensao_marcas(conexao, produtos=[1, 2])) == 2
+    assert conexao.consultas == 1
+
+    dimensao = dimensao_marcas(conexao, produtos=[1, 3])
+    assert conexao.consultas == 2
+    assert dimensao.set_index("codigoproduto").loc[3, "marca_canonica"] == "HYDRONORTH"